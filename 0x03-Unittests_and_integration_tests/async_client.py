@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""An asyncio client for auditing many github orgs concurrently
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+)
+
+from client import GithubOrgClient, _page_number, _with_page
+from utils import JsonResponse, fetch_json
+
+
+class TokenBucket:
+    """Async token bucket that adapts to GitHub's rate-limit headers.
+    Starts at rate requests per second with bursts of up to capacity. After
+    each response the rate is set so the X-RateLimit-Remaining budget lasts
+    until X-RateLimit-Reset; with nothing remaining, requests wait for the
+    reset.
+    """
+
+    def __init__(self, rate: float = 10.0, capacity: int = 10) -> None:
+        """Init method of TokenBucket"""
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last refill"""
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """Adjust the rate from X-RateLimit-Remaining/X-RateLimit-Reset"""
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+        remaining = int(remaining)
+        window = max(float(reset) - time.time(), 1.0)
+        now = time.monotonic()
+        self._refill(now)
+        if remaining <= 0:
+            self._tokens = 0.0
+            self._blocked_until = now + window
+            return
+        self.rate = remaining / window
+        self._tokens = min(self._tokens, float(remaining))
+
+
+class AsyncGithubClient:
+    """Fetches orgs and their repos for many orgs at once.
+    At most concurrency requests are in flight; the blocking pooled session
+    runs on a thread pool of the same size.
+    """
+
+    def __init__(self, concurrency: int = 10,
+                 bucket: Optional[TokenBucket] = None) -> None:
+        """Init method of AsyncGithubClient"""
+        self.concurrency = concurrency
+        self.bucket = bucket or TokenBucket()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    async def fetch(self, url: str) -> JsonResponse:
+        """Fetch url once the concurrency and rate limits allow"""
+        async with self._semaphore:
+            await self.bucket.acquire()
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(self._executor,
+                                                  fetch_json, url)
+        self.bucket.update(response.headers)
+        return response
+
+    async def org(self, org_name: str) -> Dict:
+        """Org payload"""
+        url = GithubOrgClient.ORG_URL.format(org=org_name)
+        return (await self.fetch(url)).payload
+
+    async def repos(self, org_name: str) -> List[Dict]:
+        """Every repo of the org, fetching known pages concurrently"""
+        org = await self.org(org_name)
+        first = await self.fetch(org["repos_url"])
+        repos = list(first.payload)
+        links = first.links
+
+        first_page = _page_number(links.get("next"))
+        last_page = _page_number(links.get("last"))
+        if first_page is not None and last_page is not None:
+            pages = await asyncio.gather(*(
+                self.fetch(_with_page(links["next"], page))
+                for page in range(first_page, last_page + 1)
+            ))
+            for page in pages:
+                repos.extend(page.payload)
+            return repos
+
+        next_url = links.get("next")
+        while next_url:
+            page = await self.fetch(next_url)
+            repos.extend(page.payload)
+            next_url = page.links.get("next")
+        return repos
+
+    async def public_repos(self, org_name: str,
+                           license: str = None) -> List[str]:
+        """Public repo names of the org, optionally filtered by license"""
+        return [
+            repo["name"] for repo in await self.repos(org_name)
+            if license is None or GithubOrgClient.has_license(repo, license)
+        ]
+
+    async def public_repos_for_orgs(
+            self, org_names: Iterable[str],
+            license: str = None) -> Dict[str, List[str]]:
+        """Public repo names for every org, fetched concurrently"""
+        org_names = list(org_names)
+        results = await asyncio.gather(*(
+            self.public_repos(org_name, license) for org_name in org_names
+        ))
+        return dict(zip(org_names, results))
+
+    def close(self) -> None:
+        """Shut down the worker threads"""
+        self._executor.shutdown(wait=False)
+
+
+def audit_orgs(org_names: Iterable[str], license: str = None,
+               concurrency: int = 10) -> Dict[str, List[str]]:
+    """Blocking entry point: public repos for many orgs at once"""
+    async def run() -> Dict[str, List[str]]:
+        """Run the audit on a fresh client"""
+        client = AsyncGithubClient(concurrency)
+        try:
+            return await client.public_repos_for_orgs(org_names, license)
+        finally:
+            client.close()
+
+    return asyncio.run(run())
@@ -1,22 +1,63 @@
 #!/usr/bin/env python3
 """A github org client
 """
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import (
+    Any,
+    Iterable,
+    Iterator,
     List,
     Dict,
+    Optional,
 )
+from urllib.parse import parse_qs, urlencode, urlsplit, urlunsplit
 
 from utils import (
     get_json,
-    access_nested_map,
+    get_json_page,
+    compile_path,
     memoize,
 )
 
+_license_key = compile_path(("license", "key"))
+
+
+def _page_number(url: Optional[str]) -> Optional[int]:
+    """Page number in the query string of a Link URL"""
+    if not url:
+        return None
+    pages = parse_qs(urlsplit(url).query).get("page")
+    return int(pages[0]) if pages else None
+
+
+def _with_page(url: str, page: int) -> str:
+    """url with its page query parameter set to page"""
+    parts = urlsplit(url)
+    query = parse_qs(parts.query)
+    query["page"] = [str(page)]
+    return urlunsplit(parts._replace(query=urlencode(query, doseq=True)))
+
+
+def _fetch_pages(urls: Iterable[str], workers: int) -> Iterator[Any]:
+    """Fetch urls concurrently, at most workers at a time, yielding the
+    payloads in order.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for url in urls:
+            pending.append(executor.submit(get_json_page, url))
+            if len(pending) >= workers:
+                yield pending.popleft().result()[0]
+        while pending:
+            yield pending.popleft().result()[0]
+
 
 class GithubOrgClient:
     """A Githib org client
     """
     ORG_URL = "https://api.github.com/orgs/{org}"
+    PAGE_WORKERS = 8
 
     def __init__(self, org_name: str) -> None:
         """Init method of GithubOrgClient"""
@@ -32,17 +73,46 @@ class GithubOrgClient:
         """Public repos URL"""
         return self.org["repos_url"]
 
+    def iter_repos(self) -> Iterator[Dict]:
+        """Stream every repo of the org, page by page.
+        Follows the Link rel="next" header. Once rel="last" gives the page
+        count, the remaining pages are fetched concurrently, PAGE_WORKERS
+        at a time, and still yielded in order.
+        """
+        payload, links = get_json_page(self._public_repos_url)
+        yield from payload
+
+        first_page = _page_number(links.get("next"))
+        last_page = _page_number(links.get("last"))
+        if first_page is not None and last_page is not None:
+            urls = (_with_page(links["next"], page)
+                    for page in range(first_page, last_page + 1))
+            for payload in _fetch_pages(urls, self.PAGE_WORKERS):
+                yield from payload
+            return
+
+        next_url = links.get("next")
+        while next_url:
+            payload, links = get_json_page(next_url)
+            yield from payload
+            next_url = links.get("next")
+
     @memoize
-    def repos_payload(self) -> Dict:
+    def repos_payload(self) -> List[Dict]:
         """Memoize repos payload"""
-        return get_json(self._public_repos_url)
+        return list(self.iter_repos())
 
-    def public_repos(self, license: str = None) -> List[str]:
-        """Public repos"""
-        json_payload = self.repos_payload
+    def public_repos(self, license: str = None,
+                     repos: Iterable[Dict] = None) -> List[str]:
+        """Public repos from the memoized repos_payload, so repeated calls
+        fetch the pages once. Pass repos (e.g. iter_repos()) to read a
+        single pass lazily instead.
+        """
+        if repos is None:
+            repos = self.repos_payload
         public_repos = [
-            repo["name"] for repo in json_payload
-            if license is None or self.has_license(repo, license)
+            repo["name"] for repo in repos
+            if license is None or _license_key(repo) == license
         ]
 
         return public_repos
@@ -51,8 +121,4 @@ class GithubOrgClient:
     def has_license(repo: Dict[str, Dict], license_key: str) -> bool:
         """Static: has_license"""
         assert license_key is not None, "license_key cannot be None"
-        try:
-            has_license = access_nested_map(repo, ("license", "key")) == license_key
-        except KeyError:
-            return False
-        return has_license
+        return _license_key(repo) == license_key
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Payloads for the GithubOrgClient integration tests.
+"""
+
+TEST_PAYLOAD = [
+    (
+        {"login": "google",
+         "id": 1342004,
+         "url": "https://api.github.com/orgs/google",
+         "repos_url": "https://api.github.com/orgs/google/repos"},
+        [
+            {"id": 7697149,
+             "name": "episodes.dart",
+             "full_name": "google/episodes.dart",
+             "private": False,
+             "fork": False,
+             "license": None},
+            {"id": 8566972,
+             "name": "kratu",
+             "full_name": "google/kratu",
+             "private": False,
+             "fork": False,
+             "license": {"key": "apache-2.0",
+                         "name": "Apache License 2.0",
+                         "spdx_id": "Apache-2.0"}},
+            {"id": 8858648,
+             "name": "build-debian-cloud",
+             "full_name": "google/build-debian-cloud",
+             "private": False,
+             "fork": False,
+             "license": {"key": "other",
+                         "name": "Other",
+                         "spdx_id": "NOASSERTION"}},
+            {"id": 9060347,
+             "name": "traceur-compiler",
+             "full_name": "google/traceur-compiler",
+             "private": False,
+             "fork": False,
+             "license": {"key": "apache-2.0",
+                         "name": "Apache License 2.0",
+                         "spdx_id": "Apache-2.0"}},
+            {"id": 9065917,
+             "name": "firmata.py",
+             "full_name": "google/firmata.py",
+             "private": False,
+             "fork": False,
+             "license": {"key": "mit",
+                         "name": "MIT License",
+                         "spdx_id": "MIT"}},
+        ],
+        ["episodes.dart", "kratu", "build-debian-cloud",
+         "traceur-compiler", "firmata.py"],
+        ["kratu", "traceur-compiler"],
+    ),
+]
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Module for testing the AsyncGithubClient.
+"""
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from async_client import AsyncGithubClient, TokenBucket
+from utils import JsonResponse
+
+
+def fake_github(pages: int, delay: float = 0.01):
+    """Build a fetch_json stand-in serving orgs with paginated repos.
+    Returns the function and a dict tracking the peak number of calls in
+    flight.
+    """
+    stats = {"in_flight": 0, "peak": 0, "calls": 0}
+    lock = threading.Lock()
+
+    def fetch_json(url: str) -> JsonResponse:
+        """Answer one request."""
+        with lock:
+            stats["in_flight"] += 1
+            stats["calls"] += 1
+            stats["peak"] = max(stats["peak"], stats["in_flight"])
+        time.sleep(delay)
+        with lock:
+            stats["in_flight"] -= 1
+        if "/repos" not in url:
+            org = url.rsplit("/", 1)[1]
+            repos_url = "https://api.github.com/orgs/{}/repos".format(org)
+            return JsonResponse({"repos_url": repos_url}, {}, {})
+        base, _, page = url.partition("?page=")
+        page = int(page or 1)
+        org = base.split("/")[-2]
+        links = {}
+        if page == 1 and pages > 1:
+            links = {"next": base + "?page=2",
+                     "last": base + "?page={}".format(pages)}
+        repos = [{"name": "{}-{}".format(org, page),
+                  "license": {"key": "mit" if page % 2 else "apache-2.0"}}]
+        return JsonResponse(repos, links, {})
+
+    return fetch_json, stats
+
+
+class TestAsyncGithubClient(unittest.TestCase):
+    """Tests the AsyncGithubClient class.
+    """
+    def test_public_repos_for_orgs(self) -> None:
+        """Tests that every page of every org is fetched within the limit.
+        """
+        fetch_json, stats = fake_github(pages=3)
+        org_names = ["org{}".format(n) for n in range(6)]
+
+        async def run() -> dict:
+            """Audit the orgs."""
+            client = AsyncGithubClient(concurrency=4,
+                                       bucket=TokenBucket(1000, 1000))
+            try:
+                return await client.public_repos_for_orgs(org_names)
+            finally:
+                client.close()
+
+        with patch('async_client.fetch_json', side_effect=fetch_json):
+            result = asyncio.run(run())
+
+        self.assertEqual(result["org3"], ["org3-1", "org3-2", "org3-3"])
+        self.assertEqual(len(result), 6)
+        self.assertEqual(stats["calls"], 6 * 4)
+        self.assertLessEqual(stats["peak"], 4)
+        self.assertGreater(stats["peak"], 1)
+
+    def test_public_repos_with_license(self) -> None:
+        """Tests license filtering on the async path.
+        """
+        fetch_json, _ = fake_github(pages=3, delay=0)
+
+        async def run() -> list:
+            """Fetch one org's apache-2.0 repos."""
+            client = AsyncGithubClient(bucket=TokenBucket(1000, 1000))
+            try:
+                return await client.public_repos("google", "apache-2.0")
+            finally:
+                client.close()
+
+        with patch('async_client.fetch_json', side_effect=fetch_json):
+            self.assertEqual(asyncio.run(run()), ["google-2"])
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Tests the TokenBucket class.
+    """
+    def test_update_spreads_remaining_budget(self) -> None:
+        """Tests that the rate follows the X-RateLimit headers.
+        """
+        bucket = TokenBucket(rate=100, capacity=10)
+        bucket.update({"X-RateLimit-Remaining": "100",
+                       "X-RateLimit-Reset": str(time.time() + 50)})
+        self.assertAlmostEqual(bucket.rate, 2, delta=0.1)
+
+    def test_update_without_headers(self) -> None:
+        """Tests that responses without rate-limit headers change nothing.
+        """
+        bucket = TokenBucket(rate=5, capacity=10)
+        bucket.update({})
+        self.assertEqual(bucket.rate, 5)
+
+    def test_acquire_waits_when_empty(self) -> None:
+        """Tests that acquire paces requests once the burst is spent.
+        """
+        bucket = TokenBucket(rate=50, capacity=1)
+
+        async def run() -> float:
+            """Take three tokens and time it."""
+            started = time.monotonic()
+            for _ in range(3):
+                await bucket.acquire()
+            return time.monotonic() - started
+
+        self.assertGreaterEqual(asyncio.run(run()), 0.035)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@
 """Module for testing the GithubOrgClient.
 """
 import unittest
+from typing import Dict
 from unittest.mock import patch, PropertyMock, Mock
 from parameterized import parameterized, parameterized_class
 from client import GithubOrgClient
@@ -42,12 +43,12 @@ class TestGithubOrgClient(unittest.TestCase):
             client = GithubOrgClient("testorg")
             self.assertEqual(client._public_repos_url, expected_url)
 
-    @patch('client.get_json')
-    def test_repos_payload(self, mock_get_json: Mock) -> None:
+    @patch('client.get_json_page')
+    def test_repos_payload(self, mock_get_json_page: Mock) -> None:
         """Tests that repos_payload returns the expected JSON.
         """
-        # Mock get_json to return a list of repo payloads
-        mock_get_json.return_value = [{"name": "repo1"}, {"name": "repo2"}]
+        # Mock get_json_page to return a single page of repo payloads
+        mock_get_json_page.return_value = ([{"name": "repo1"}, {"name": "repo2"}], {})
 
         # Mock _public_repos_url property
         with patch('client.GithubOrgClient._public_repos_url', new_callable=PropertyMock) as mock_public_repos_url:
@@ -56,11 +57,74 @@ class TestGithubOrgClient(unittest.TestCase):
             client = GithubOrgClient("testorg")
             result = client.repos_payload
 
-            # Assert get_json was called with the mocked URL
-            mock_get_json.assert_called_once_with("http://mock.url/repos")
+            # Assert get_json_page was called with the mocked URL
+            mock_get_json_page.assert_called_once_with("http://mock.url/repos")
             # Assert the result is the mocked payload
             self.assertEqual(result, [{"name": "repo1"}, {"name": "repo2"}])
 
+    @patch('client.get_json_page')
+    def test_iter_repos_follows_next(self, mock_get_json_page: Mock) -> None:
+        """Tests that iter_repos follows rel="next" links without rel="last".
+        """
+        pages = {
+            "http://mock.url/repos": (
+                [{"name": "repo1"}], {"next": "http://mock.url/repos?after=a"}),
+            "http://mock.url/repos?after=a": (
+                [{"name": "repo2"}], {"next": "http://mock.url/repos?after=b"}),
+            "http://mock.url/repos?after=b": ([{"name": "repo3"}], {}),
+        }
+        mock_get_json_page.side_effect = pages.get
+
+        with patch('client.GithubOrgClient._public_repos_url', new_callable=PropertyMock) as mock_public_repos_url:
+            mock_public_repos_url.return_value = "http://mock.url/repos"
+            client = GithubOrgClient("testorg")
+
+            self.assertEqual(client.public_repos(repos=client.iter_repos()),
+                             ["repo1", "repo2", "repo3"])
+            self.assertEqual(mock_get_json_page.call_count, 3)
+
+    @patch('client.get_json_page')
+    def test_iter_repos_fetches_known_pages(self, mock_get_json_page: Mock) -> None:
+        """Tests that iter_repos fetches pages 2..last once rel="last" is known.
+        """
+        def page(url: str) -> tuple:
+            """Return one repo per page, links only on the first page."""
+            if url == "http://mock.url/repos":
+                return [{"name": "repo1"}], {
+                    "next": "http://mock.url/repos?per_page=1&page=2",
+                    "last": "http://mock.url/repos?per_page=1&page=20",
+                }
+            number = int(url.rsplit("=", 1)[1])
+            return [{"name": "repo{}".format(number)}], {}
+
+        mock_get_json_page.side_effect = page
+
+        with patch('client.GithubOrgClient._public_repos_url', new_callable=PropertyMock) as mock_public_repos_url:
+            mock_public_repos_url.return_value = "http://mock.url/repos"
+            client = GithubOrgClient("testorg")
+
+            self.assertEqual(client.public_repos(),
+                             ["repo{}".format(n) for n in range(1, 21)])
+            mock_get_json_page.assert_any_call("http://mock.url/repos?per_page=1&page=20")
+            self.assertEqual(mock_get_json_page.call_count, 20)
+
+    @patch('client.get_json_page')
+    def test_public_repos_fetches_pages_once(self, mock_get_json_page: Mock) -> None:
+        """Tests that repeated public_repos calls reuse the memoized pages.
+        """
+        mock_get_json_page.return_value = (
+            [{"name": "repo1", "license": {"key": "mit"}},
+             {"name": "repo2", "license": {"key": "apache-2.0"}}], {})
+
+        with patch('client.GithubOrgClient._public_repos_url', new_callable=PropertyMock) as mock_public_repos_url:
+            mock_public_repos_url.return_value = "http://mock.url/repos"
+            client = GithubOrgClient("testorg")
+
+            self.assertEqual(client.public_repos(), ["repo1", "repo2"])
+            self.assertEqual(client.public_repos("mit"), ["repo1"])
+            self.assertEqual(len(client.repos_payload), 2)
+            mock_get_json_page.assert_called_once_with("http://mock.url/repos")
+
     @parameterized.expand([
         ({"license": {"key": "my_license"}}, "my_license", True),
         ({"license": {"key": "other_license"}}, "my_license", False),
@@ -84,34 +148,34 @@ class TestIntegrationGithubOrgClient(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
         """Set up class for integration tests.
-        Mocks requests.get to return predefined payloads from fixtures.
+        Mocks requests.Session.get to return predefined payloads from fixtures.
         """
-        # Mock requests.get globally for the duration of these tests
+        # Mock the pooled session's get for the duration of these tests
         # We need to map URLs to specific responses
-        cls.get_patcher = patch('requests.get', side_effect=cls.mapped_requests_get)
+        cls.get_patcher = patch('requests.Session.get', side_effect=cls.mapped_requests_get)
         cls.mock_get = cls.get_patcher.start()
 
     @classmethod
     def tearDownClass(cls) -> None:
         """Tear down class after integration tests.
-        Stops the mocked requests.get.
+        Stops the mocked requests.Session.get.
         """
         cls.get_patcher.stop()
 
     @classmethod
-    def mapped_requests_get(cls, url: str) -> Mock:
+    def mapped_requests_get(cls, url: str, **kwargs) -> Mock:
         """Helper to map URLs to fixture data."""
         if url == "https://api.github.com/orgs/google":
-            mock_response = Mock()
+            mock_response = Mock(status_code=200, links={})
             mock_response.json.return_value = cls.org_payload
             return mock_response
         elif url == "https://api.github.com/orgs/google/repos":
-            mock_response = Mock()
+            mock_response = Mock(status_code=200, links={})
             mock_response.json.return_value = cls.repos_payload
             return mock_response
         else:
             # Fallback for unexpected URLs, though not expected here
-            return Mock(json=Mock(return_value={}))
+            return Mock(status_code=200, links={}, json=Mock(return_value={}))
 
     def test_public_repos(self) -> None:
         """Tests public_repos without a license.
@@ -1,10 +1,17 @@
 #!/usr/bin/env python3
 """Module for testing utils functions.
 """
+import json
+import shutil
+import tempfile
+import threading
+import time
 import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from unittest.mock import patch, Mock
 from parameterized import parameterized
-from utils import access_nested_map, get_json, memoize
+import utils
+from utils import access_nested_map, compile_path, get_json, memoize, memoize_method, pluck
 
 
 class TestAccessNestedMap(unittest.TestCase):
@@ -32,6 +39,63 @@ class TestAccessNestedMap(unittest.TestCase):
             access_nested_map(nested_map, path)
 
 
+class TestCompilePath(unittest.TestCase):
+    """Tests the compile_path and pluck functions.
+    """
+    @parameterized.expand([
+        ({"a": 1}, ("a",), 1),
+        ({"a": {"b": 2}}, ("a", "b"), 2),
+        ({"a": {"b": {"c": 3}}}, "a.b.c", 3),
+        ({"a": [{"b": 1}, {"b": 2}]}, ("a", 1, "b"), 2),
+        ({"a": [{"b": 1}, {"c": 2}, {"b": 3}]}, ("a", "*", "b"), [1, 3]),
+        ({"a": {"x": {"b": 1}, "y": {"b": 2}}}, ("a", "*", "b"), [1, 2]),
+        ({"a": [{"b": 1}, {"b": 2}]}, "a.1.b", 2),
+        ({"a": {"1": {"b": 2}}}, "a.1.b", 2),
+    ])
+    def test_compile_path(self, nested_map: dict, path: tuple, expected: any) -> None:
+        """Tests that compiled getters find the expected value.
+        """
+        self.assertEqual(compile_path(path)(nested_map), expected)
+
+    @parameterized.expand([
+        ({}, ("a",)),
+        ({"a": 1}, ("a", "b")),
+        ({"a": None}, ("a", "b")),
+        ({"a": "text"}, ("a", "b")),
+        ({"a": [1]}, ("a", 3)),
+        ({"a": 1}, ("a", "*", "b")),
+    ])
+    def test_compile_path_default(self, nested_map: dict, path: tuple) -> None:
+        """Tests that missing paths return the default instead of raising.
+        """
+        self.assertIsNone(compile_path(path)(nested_map))
+        self.assertEqual(compile_path(path, default="none")(nested_map), "none")
+
+    def test_compile_path_is_cached(self) -> None:
+        """Tests that compiling the same path twice returns the same getter.
+        """
+        self.assertIs(compile_path(("license", "key")),
+                      compile_path(["license", "key"]))
+
+    def test_compile_path_default_type(self) -> None:
+        """Tests that equal defaults of different types get their own getter.
+        """
+        self.assertIs(compile_path(("a",), 0)({}), 0)
+        self.assertIs(compile_path(("a",), False)({}), False)
+
+    def test_pluck(self) -> None:
+        """Tests that pluck applies the getter to every payload.
+        """
+        repos = [
+            {"license": {"key": "mit"}},
+            {"license": None},
+            {},
+            {"license": {"key": "apache-2.0"}},
+        ]
+        self.assertEqual(pluck(repos, ("license", "key")),
+                         ["mit", None, None, "apache-2.0"])
+
+
 class TestGetJson(unittest.TestCase):
     """Tests the get_json function.
     """
@@ -39,22 +103,106 @@ class TestGetJson(unittest.TestCase):
         ("http://example.com", {"payload": True}),
         ("http://holberton.io", {"status": "ok"}),
     ])
-    @patch('utils.requests.get')
-    def test_get_json(self, test_url: str, test_payload: dict, mock_requests_get: Mock) -> None:
+    @patch('utils.get_session')
+    def test_get_json(self, test_url: str, test_payload: dict, mock_get_session: Mock) -> None:
         """Tests that get_json returns the expected JSON.
         """
-        # Configure the mock to return a mock response object
+        # Configure the mock session to return a mock response object
         # which itself returns test_payload when .json() is called
-        mock_requests_get.return_value.json.return_value = test_payload
+        mock_get = mock_get_session.return_value.get
+        mock_get.return_value.json.return_value = test_payload
 
         result = get_json(test_url)
 
-        # Assert that requests.get was called exactly once with the test_url
-        mock_requests_get.assert_called_once_with(test_url)
+        # Assert that the shared session was called exactly once with the test_url
+        mock_get.assert_called_once_with(
+            test_url, headers={}, timeout=utils.DEFAULT_TIMEOUT
+        )
 
         # Assert that the result is the expected payload
         self.assertEqual(result, test_payload)
 
+    def test_get_session_is_shared(self) -> None:
+        """Tests that get_session returns the same pooled session.
+        """
+        self.assertIs(utils.get_session(), utils.get_session())
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves a JSON payload with an ETag and answers 304 when it matches.
+    """
+    payload = {"repos": ["episodes.dart", "kratu"]}
+    etag = '"v1"'
+    requests_seen = []
+
+    def do_GET(self) -> None:
+        """Handle GET requests."""
+        self.requests_seen.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps(self.payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", self.etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        """Keep test output quiet."""
+
+
+class TestGetJsonCache(unittest.TestCase):
+    """Tests get_json conditional requests against a local stub server.
+    """
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Start the stub server."""
+        cls.server = HTTPServer(("127.0.0.1", 0), StubHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.url = "http://127.0.0.1:{}/orgs/google".format(cls.server.server_port)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """Stop the stub server."""
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self) -> None:
+        """Use a fresh cache directory for each test."""
+        StubHandler.requests_seen.clear()
+        self.cache_dir = tempfile.mkdtemp()
+        utils.enable_response_cache(self.cache_dir)
+
+    def tearDown(self) -> None:
+        """Turn the cache off again."""
+        utils.enable_response_cache(None)
+        shutil.rmtree(self.cache_dir)
+
+    def test_not_modified_served_from_disk(self) -> None:
+        """Tests that a 304 answer returns the cached payload.
+        """
+        first = get_json(self.url)
+        second = get_json(self.url)
+
+        self.assertEqual(first, StubHandler.payload)
+        self.assertEqual(second, StubHandler.payload)
+        self.assertNotIn("If-None-Match", StubHandler.requests_seen[0])
+        self.assertEqual(StubHandler.requests_seen[1]["If-None-Match"], '"v1"')
+
+    def test_cache_disabled(self) -> None:
+        """Tests that no conditional headers are sent without a cache.
+        """
+        utils.enable_response_cache(None)
+        get_json(self.url)
+        get_json(self.url)
+
+        for headers in StubHandler.requests_seen:
+            self.assertNotIn("If-None-Match", headers)
+
 
 class TestMemoize(unittest.TestCase):
     """Tests the memoize decorator.
@@ -87,6 +235,154 @@ class TestMemoize(unittest.TestCase):
             self.assertEqual(result1, 42)
             self.assertEqual(result2, 42)
 
+    def test_memoize_concurrent_first_access(self) -> None:
+        """Tests that concurrent first accesses run the method once.
+        """
+        calls = []
+
+        class TestClass:
+            """A class with a slow memoized property."""
+            @memoize
+            def a_property(self) -> int:
+                """A slow property."""
+                calls.append(1)
+                time.sleep(0.05)
+                return 42
+
+        test_instance = TestClass()
+        threads = [threading.Thread(target=lambda: test_instance.a_property)
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(test_instance.a_property, 42)
+
+
+class TestMemoizeMethod(unittest.TestCase):
+    """Tests the memoize_method decorator.
+    """
+    def make_class(self, **options) -> type:
+        """Build a class whose double method counts its calls."""
+        class TestClass:
+            """A class to test memoize_method."""
+            def __init__(self, name: str = "a") -> None:
+                """Init method."""
+                self.name = name
+                self.calls = 0
+
+            @memoize_method(**options)
+            def double(self, x: int) -> int:
+                """Doubles x."""
+                self.calls += 1
+                return x * 2
+
+        return TestClass
+
+    def test_caches_per_arguments(self) -> None:
+        """Tests that results are cached per argument tuple.
+        """
+        test_instance = self.make_class()()
+        self.assertEqual(test_instance.double(2), 4)
+        self.assertEqual(test_instance.double(2), 4)
+        self.assertEqual(test_instance.double(3), 6)
+        self.assertEqual(test_instance.calls, 2)
+        self.assertEqual(test_instance.double.cache_info(),
+                         {"hits": 1, "misses": 2, "size": 2})
+
+    def test_invalidate_and_refresh(self) -> None:
+        """Tests explicit invalidation and refresh.
+        """
+        test_instance = self.make_class()()
+        test_instance.double(2)
+        test_instance.double.invalidate(2)
+        test_instance.double(2)
+        test_instance.double.refresh(2)
+        self.assertEqual(test_instance.calls, 3)
+
+    def test_invalidate_during_compute(self) -> None:
+        """Tests that a value computed across an invalidation is not cached.
+        """
+        started, release = threading.Event(), threading.Event()
+        values = iter(["old", "new"])
+
+        class TestClass:
+            """A class whose memoized method blocks on its first call."""
+            @memoize_method()
+            def load(self) -> str:
+                """Returns the next value, blocking the first time."""
+                value = next(values)
+                if value == "old":
+                    started.set()
+                    release.wait(5)
+                return value
+
+        test_instance = TestClass()
+        results = []
+        thread = threading.Thread(target=lambda: results.append(test_instance.load()))
+        thread.start()
+        started.wait(5)
+        test_instance.load.invalidate()
+        self.assertEqual(test_instance.load(), "new")
+        release.set()
+        thread.join(5)
+        self.assertEqual(results, ["old"])
+        self.assertEqual(test_instance.load(), "new")
+
+    def test_ttl(self) -> None:
+        """Tests that entries expire after the TTL.
+        """
+        test_instance = self.make_class(ttl=0.01)()
+        test_instance.double(2)
+        time.sleep(0.02)
+        test_instance.double(2)
+        self.assertEqual(test_instance.calls, 2)
+
+    def test_maxsize(self) -> None:
+        """Tests that the least recently used entry is evicted.
+        """
+        test_instance = self.make_class(maxsize=2)()
+        for x in (1, 2, 1, 3, 1):
+            test_instance.double(x)
+        self.assertEqual(test_instance.calls, 3)
+        test_instance.double(2)
+        self.assertEqual(test_instance.calls, 4)
+
+    def test_shared_cache(self) -> None:
+        """Tests that shared caches are keyed by instance_key.
+        """
+        test_class = self.make_class(shared=True, instance_key=lambda self: self.name)
+        first, second, other = test_class("a"), test_class("a"), test_class("b")
+        first.double(2)
+        second.double(2)
+        other.double(2)
+        self.assertEqual((first.calls, second.calls, other.calls), (1, 0, 1))
+
+    def test_single_flight(self) -> None:
+        """Tests that concurrent calls with the same arguments run once.
+        """
+        calls = []
+
+        class TestClass:
+            """A class with a slow memoized method."""
+            @memoize_method()
+            def slow(self, x: int) -> int:
+                """A slow method."""
+                calls.append(x)
+                time.sleep(0.05)
+                return x
+
+        test_instance = TestClass()
+        threads = [threading.Thread(target=test_instance.slow, args=(1,))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(calls, [1])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,22 +1,52 @@
 #!/usr/bin/env python3
 """Generic utilities for github org client.
 """
+import hashlib
+import json
+import os
+import threading
+import time
 import requests
-from functools import wraps
+from collections import OrderedDict
+from concurrent.futures import Future
+from requests.adapters import HTTPAdapter
+from functools import lru_cache, wraps
 from typing import (
     Mapping,
     Sequence,
     Any,
     Dict,
     Callable,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
 )
 
 __all__ = [
     "access_nested_map",
+    "compile_path",
+    "pluck",
     "get_json",
+    "get_json_page",
+    "fetch_json",
+    "JsonResponse",
+    "get_session",
+    "ResponseCache",
+    "enable_response_cache",
     "memoize",
+    "memoize_method",
 ]
 
+DEFAULT_TIMEOUT = 10
+POOL_SIZE = 20
+
+_session = None
+_session_lock = threading.Lock()
+_response_cache = None
+_memoize_lock = threading.Lock()
+
 
 def access_nested_map(nested_map: Mapping, path: Sequence) -> Any:
     """Access nested map with key path.
@@ -40,11 +70,216 @@ def access_nested_map(nested_map: Mapping, path: Sequence) -> Any:
     return nested_map
 
 
-def get_json(url: str) -> Dict:
+WILDCARD = "*"
+_MISS = object()
+
+
+def _key_getter(keys: Tuple, default: Any) -> Callable[[Any], Any]:
+    """Getter following a path of plain keys"""
+    def get(value: Any) -> Any:
+        """Follow keys from value"""
+        for key in keys:
+            if type(value) is dict:
+                value = value.get(key, _MISS)
+                if value is _MISS:
+                    return default
+                continue
+            if isinstance(key, str) and not isinstance(value, Mapping):
+                # "items.0.name": a digit segment indexes into a list
+                if not (key.isdigit() and isinstance(value, (list, tuple))):
+                    return default
+                key = int(key)
+            try:
+                value = value[key]
+            except (KeyError, IndexError, TypeError):
+                return default
+        return value
+
+    return get
+
+
+@lru_cache(maxsize=256, typed=True)
+def _compile(path: Tuple, default: Any) -> Callable[[Any], Any]:
+    """Build (and cache) the getter for a normalized path"""
+    if WILDCARD not in path:
+        return _key_getter(path, default)
+
+    split = path.index(WILDCARD)
+    head = _key_getter(path[:split], _MISS)
+    tail = _compile(path[split + 1:], _MISS)
+
+    def get(value: Any) -> Any:
+        """Follow the path, fanning out at the wildcard"""
+        value = head(value)
+        if isinstance(value, Mapping):
+            items = value.values()
+        elif isinstance(value, (list, tuple)):
+            items = value
+        else:
+            return default
+        found = [tail(item) for item in items]
+        return [item for item in found if item is not _MISS]
+
+    return get
+
+
+def compile_path(path: Sequence, default: Any = None) -> Callable[[Any], Any]:
+    """Compile a key path into a reusable getter.
+    The getter returns default instead of raising when the path is missing.
+    Integer segments, and digit segments such as the 0 in "items.0.name",
+    index into lists; a digit segment still matches a string key of a
+    mapping. A "*" segment maps the rest of the path over every element of
+    a list (or value of a mapping), returning the list of values found.
+    Getters are cached per path and default (including its type).
+    Parameters
+    ----------
+    path: Sequence
+        a sequence of keys, or a dotted string such as "license.key"
+    default: Any
+        value returned when the path is missing
+    Example
+    -------
+    >>> get_key = compile_path(("license", "key"))
+    >>> get_key({"license": {"key": "mit"}}), get_key({"license": None})
+    ('mit', None)
+    >>> compile_path("topics.*.name")({"topics": [{"name": "a"}, {}]})
+    ['a']
+    """
+    if isinstance(path, str):
+        path = path.split(".")
+    try:
+        return _compile(tuple(path), default)
+    except TypeError:
+        # Unhashable default: build the getter without caching it
+        return _compile.__wrapped__(tuple(path), default)
+
+
+def pluck(payloads: Iterable, path: Sequence, default: Any = None) -> List:
+    """Apply the compiled getter for path to every payload.
+    Example
+    -------
+    >>> pluck([{"a": {"b": 1}}, {"a": 2}], ("a", "b"))
+    [1, None]
+    """
+    return list(map(compile_path(path, default), payloads))
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide HTTP session.
+    The session keeps connections alive and pools up to POOL_SIZE of them
+    per host, so repeated calls skip the TCP/TLS handshake.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE,
+                                  pool_maxsize=POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+class ResponseCache:
+    """On-disk cache of JSON responses keyed by URL.
+    Each entry keeps the payload with its ETag and Last-Modified headers so
+    the next request can be made conditional.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """Init method of ResponseCache"""
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        """File holding the entry for url"""
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest + ".json")
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Cached entry for url, or None"""
+        try:
+            with open(self._path(url), encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url: str, payload: Any, etag: Optional[str],
+            last_modified: Optional[str],
+            links: Optional[Dict[str, str]] = None) -> None:
+        """Store payload, its validators and its Link relations for url"""
+        entry = {"etag": etag, "last_modified": last_modified,
+                 "payload": payload, "links": links or {}}
+        path = self._path(url)
+        tmp_path = "{}.{}.tmp".format(path, threading.get_ident())
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(entry, file)
+        os.replace(tmp_path, path)
+
+
+def enable_response_cache(directory: Optional[str]) -> None:
+    """Turn the on-disk response cache used by get_json on (or off with None).
+    """
+    global _response_cache
+    _response_cache = ResponseCache(directory) if directory else None
+
+
+class JsonResponse(NamedTuple):
+    """A decoded JSON response with its Link relations and headers"""
+    payload: Any
+    links: Dict[str, str]
+    headers: Mapping[str, str]
+
+
+def fetch_json(url: str, timeout: float = DEFAULT_TIMEOUT) -> JsonResponse:
+    """Get JSON from remote URL along with its Link relations and headers.
+    Uses the shared pooled session. When the response cache is enabled,
+    the request carries If-None-Match/If-Modified-Since and a 304 answer
+    is served from disk.
+    """
+    cache = _response_cache
+    entry = cache.get(url) if cache is not None else None
+    headers = {}
+    if entry is not None:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    response = get_session().get(url, headers=headers, timeout=timeout)
+    if entry is not None and response.status_code == 304:
+        return JsonResponse(entry["payload"], entry.get("links", {}),
+                            response.headers)
+
+    payload = response.json()
+    links = {rel: link["url"] for rel, link in response.links.items()}
+    if cache is not None and response.status_code == 200:
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            cache.put(url, payload, etag, last_modified, links)
+    return JsonResponse(payload, links, response.headers)
+
+
+def get_json_page(
+        url: str,
+        timeout: float = DEFAULT_TIMEOUT) -> Tuple[Any, Dict[str, str]]:
+    """Get JSON from remote URL together with its Link header relations.
+    Returns
+    -------
+    (payload, links) where links maps a rel such as "next" or "last" to
+    its URL.
+    """
+    response = fetch_json(url, timeout)
+    return response.payload, response.links
+
+
+def get_json(url: str, timeout: float = DEFAULT_TIMEOUT) -> Dict:
     """Get JSON from remote URL.
+    See fetch_json for the session and caching behaviour.
     """
-    response = requests.get(url)
-    return response.json()
+    return fetch_json(url, timeout).payload
 
 
 def memoize(fn: Callable) -> Callable:
@@ -64,12 +299,208 @@ def memoize(fn: Callable) -> Callable:
     42
     """
     attr_name = "_{}".format(fn.__name__)
+    lock_name = "_{}_lock".format(fn.__name__)
 
     @wraps(fn)
     def memoized(self):
         """"memoized wraps"""
         if not hasattr(self, attr_name):
-            setattr(self, attr_name, fn(self))
+            # One lock per instance and property, so concurrent first
+            # accesses run fn once without serializing other instances
+            with _memoize_lock:
+                lock = self.__dict__.setdefault(lock_name, threading.Lock())
+            with lock:
+                if not hasattr(self, attr_name):
+                    setattr(self, attr_name, fn(self))
         return getattr(self, attr_name)
 
     return property(memoized)
+
+
+class MemoCache:
+    """Thread-safe bounded LRU cache with optional TTL and single-flight
+    loading: concurrent misses on one key compute the value once. A key
+    invalidated while it is being computed is not stored, and later
+    callers compute it afresh instead of waiting for the old result.
+    """
+
+    def __init__(self, maxsize: Optional[int] = 128,
+                 ttl: Optional[float] = None) -> None:
+        """Init method of MemoCache"""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Any, compute: Callable[[], Any],
+                       force: bool = False) -> Any:
+        """Cached value for key, computing it on a miss or when force"""
+        with self._lock:
+            entry = None if force else self._entries.get(key)
+            if entry is not None and (entry[1] is None
+                                      or entry[1] > time.monotonic()):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = Future()
+                self.misses += 1
+            else:
+                self.hits += 1
+        if not leader:
+            return flight.result()
+        try:
+            value = compute()
+        except BaseException as err:
+            flight.set_exception(err)
+            raise
+        else:
+            expires = (time.monotonic() + self.ttl
+                       if self.ttl is not None else None)
+            with self._lock:
+                # invalidate() detaches the flight; its value predates that
+                if self._inflight.get(key) is flight:
+                    self._entries[key] = (value, expires)
+                    self._entries.move_to_end(key)
+                    if self.maxsize is not None:
+                        while len(self._entries) > self.maxsize:
+                            self._entries.popitem(last=False)
+            flight.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+
+    def invalidate(self, key: Any = None, all_keys: bool = False) -> None:
+        """Drop key, or every entry when all_keys"""
+        with self._lock:
+            if all_keys:
+                self._entries.clear()
+                self._inflight.clear()
+            else:
+                self._entries.pop(key, None)
+                self._inflight.pop(key, None)
+
+    def info(self) -> Dict[str, int]:
+        """Hit, miss and size counters"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "size": len(self._entries)}
+
+
+class _BoundMemoized:
+    """A memoize_method bound to one instance"""
+
+    def __init__(self, memoized: "_MemoizedMethod", instance: Any) -> None:
+        """Init method of _BoundMemoized"""
+        self._memoized = memoized
+        self._instance = instance
+        self._cache = memoized.cache_for(instance)
+
+    def _key(self, args: tuple, kwargs: Dict) -> tuple:
+        """Cache key for a call"""
+        key = (args, tuple(sorted(kwargs.items())))
+        if self._memoized.shared:
+            key = (self._memoized.instance_key(self._instance),) + key
+        return key
+
+    def __call__(self, *args, **kwargs) -> Any:
+        """Cached call"""
+        return self._cache.get_or_compute(
+            self._key(args, kwargs),
+            lambda: self._memoized.fn(self._instance, *args, **kwargs))
+
+    def refresh(self, *args, **kwargs) -> Any:
+        """Recompute and cache the value for these arguments"""
+        return self._cache.get_or_compute(
+            self._key(args, kwargs),
+            lambda: self._memoized.fn(self._instance, *args, **kwargs),
+            force=True)
+
+    def invalidate(self, *args, **kwargs) -> None:
+        """Forget the value for these arguments"""
+        self._cache.invalidate(self._key(args, kwargs))
+
+    def cache_info(self) -> Dict[str, int]:
+        """Hit, miss and size counters of the backing cache"""
+        return self._cache.info()
+
+
+class _MemoizedMethod:
+    """Descriptor behind memoize_method"""
+
+    def __init__(self, fn: Callable, ttl: Optional[float],
+                 maxsize: Optional[int], shared: bool,
+                 instance_key: Callable[[Any], Any]) -> None:
+        """Init method of _MemoizedMethod"""
+        self.fn = fn
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.shared = shared
+        self.instance_key = instance_key
+        self.attr_name = "_{}_cache".format(fn.__name__)
+        self.shared_cache = MemoCache(maxsize, ttl) if shared else None
+        self.__doc__ = fn.__doc__
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        """Name the per-instance cache after the attribute"""
+        self.attr_name = "_{}_cache".format(name)
+
+    def cache_for(self, instance: Any) -> MemoCache:
+        """The cache used for instance"""
+        if self.shared:
+            return self.shared_cache
+        cache = instance.__dict__.get(self.attr_name)
+        if cache is None:
+            with _memoize_lock:
+                cache = instance.__dict__.setdefault(
+                    self.attr_name, MemoCache(self.maxsize, self.ttl))
+        return cache
+
+    def __get__(self, instance: Any, owner: type = None) -> Any:
+        """Bind to instance"""
+        if instance is None:
+            return self
+        return _BoundMemoized(self, instance)
+
+
+def memoize_method(ttl: Optional[float] = None, maxsize: Optional[int] = 128,
+                   shared: bool = False,
+                   instance_key: Callable[[Any], Any] = lambda self: self
+                   ) -> Callable[[Callable], _MemoizedMethod]:
+    """Decorator to memoize a method, including methods with arguments.
+    Concurrent first calls with the same arguments run the method once.
+    Entries expire after ttl seconds when given, and each cache keeps at
+    most maxsize entries (least recently used dropped first).
+
+    By default every instance has its own cache. With shared=True all
+    instances use one bounded cache keyed by instance_key(self) and the
+    arguments, so equal instances share results.
+    Example
+    -------
+    class MyClass:
+        @memoize_method(ttl=60)
+        def a_method(self, x):
+            print("a_method called")
+            return x * 2
+    >>> my_object = MyClass()
+    >>> my_object.a_method(21)
+    a_method called
+    42
+    >>> my_object.a_method(21)
+    42
+    >>> my_object.a_method.invalidate(21)
+    >>> my_object.a_method.cache_info()
+    {'hits': 1, 'misses': 1, 'size': 0}
+    """
+    def decorator(fn: Callable) -> _MemoizedMethod:
+        """Wrap fn in the memoizing descriptor"""
+        return _MemoizedMethod(fn, ttl, maxsize, shared, instance_key)
+
+    return decorator
@@ -2,6 +2,8 @@ import functools
 import sqlite3
 from datetime import datetime
 
+from query_logger import log_queries
+
 # DATABASE SETUP
 
 def create_database(db_name='users.db'):
@@ -28,7 +30,10 @@ def create_database(db_name='users.db'):
                   timestamp TEXT NOT NULL,
                   function_name TEXT NOT NULL,
                   query_type TEXT,
-                  message TEXT
+                  message TEXT,
+                  duration_ms REAL,
+                  row_count INTEGER,
+                  fingerprint TEXT
               )
          ''')
 
@@ -75,7 +80,7 @@ def create_database(db_name='users.db'):
 #                  conn.close()
 #      return wrapper
 
-#@log_database_query
+@log_queries
 def fetch_all_users(query):
     conn = sqlite3.connect('users.db')
     cursor = conn.cursor()
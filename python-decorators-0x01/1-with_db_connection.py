@@ -1,6 +1,10 @@
 import sqlite3
 import functools
 
+import db_connections
+from statements import batchable
+from user_loader import fetch_users_by_ids
+
 def with_db_connection(func):
 
     @functools.wraps(func)
@@ -8,7 +12,7 @@ def with_db_connection(func):
         conn = None
         result = None
         try:
-            conn = sqlite3.connect('users.db')
+            conn = db_connections.connect()
 
 
             result = func(conn,*args, **kwargs)
@@ -22,11 +26,18 @@ def with_db_connection(func):
                 result = None
         finally:
             if conn:
-                conn.close()
+                db_connections.release(conn)
         return result
     return wrapper
 
+def get_users_batch(conn, items):
+    # batch=[1, 2, ...] becomes one WHERE id IN (...) query
+    user_ids = [user_id for user_id, in items]
+    users = fetch_users_by_ids(conn, user_ids)
+    return [users.get(user_id) for user_id in user_ids]
+
 @with_db_connection
+@batchable(batch_fetch=get_users_batch)
 def get_user_by_id(conn, user_id):
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
@@ -1,6 +1,10 @@
 import sqlite3
 import functools
 
+import cache_store
+import db_connections
+from statements import batchable
+
 
 """
 Writing a decorator transactional(func) that ensures a function running a database operation
@@ -14,7 +18,7 @@ def with_db_connection(func):
     def wrapper(* args, **kwargs):
         conn = None
         try:
-            conn = sqlite3.connect('users.db')
+            conn = db_connections.connect()
 
 
             func(conn,*args, **kwargs)
@@ -26,7 +30,7 @@ def with_db_connection(func):
             raise
         finally:
             if conn:
-                conn.close()
+                db_connections.release(conn)
                      
     return wrapper
 
@@ -34,7 +38,10 @@ def transactional(func):
 
     @functools.wraps(func)
     def wrapper(conn, *args, **kwargs):
-
+        # Record every statement run in the transaction so cached reads of
+        # the tables it writes can be invalidated once it commits
+        statements = []
+        conn.set_trace_callback(statements.append)
         try:
             
             func(conn, *args, **kwargs)
@@ -48,12 +55,17 @@ def transactional(func):
                 conn.rollback()
                 
             raise
+        finally:
+            conn.set_trace_callback(None)
+
+        cache_store.invalidate_statements(statements)
         
     return wrapper
                 
             
 @with_db_connection
 @transactional
+@batchable
 def update_user_email(conn, user_id, new_email):
     cursor = conn.cursor()
     cursor.execute("UPDATE users SET email = ? WHERE id = ?", (new_email, user_id))
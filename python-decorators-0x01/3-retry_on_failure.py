@@ -1,42 +1,137 @@
 import sqlite3
+import asyncio
 import functools
+import inspect
+import random
+import threading
 import time
 
+import db_connections
+
 def with_db_connection(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
 
         try:
             
-            conn = sqlite3.connect('users.db')
+            conn = db_connections.connect()
             func(conn, *args, **kwargs)
 
         except sqlite3.Error as e:
             print(f"{e}")
         finally:
             if conn:
-                conn.close()
+                db_connections.release(conn)
     return wrapper
 
 
-def retry_on_failure(retries=3, delay=1):
+TRANSIENT_CODES = (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+# sqlite3's messages for those codes, for errors raised without a code
+TRANSIENT_ERRORS = ("database is locked", "database table is locked")
+
+# Per-function retry metrics: calls, retries, time spent backing off and
+# calls that gave up
+retry_stats = {}
+_stats_lock = threading.Lock()
+
+
+def is_transient(error):
+    """
+    Lock contention is worth retrying; anything else (bad SQL, constraint
+    violations, missing tables) fails the same way every time.
+    """
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        # Extended codes (e.g. SQLITE_BUSY_SNAPSHOT) keep the primary code
+        # in the low byte
+        return code & 0xFF in TRANSIENT_CODES
+    return str(error).lower() in TRANSIENT_ERRORS
+
+
+def _count(stats, name, amount=1):
+    with _stats_lock:
+        stats[name] += amount
+
+
+def _backoff(attempt, delay, max_delay):
+    # Full jitter: sleep a random time up to the exponential cap so that
+    # callers contending for the same lock spread their retries out
+    return random.uniform(0, min(max_delay, delay * 2 ** attempt))
+
+
+def retry_on_failure(retries=3, delay=1, max_delay=30, max_elapsed=None,
+                     retry_if=is_transient):
+    """
+    Decorator that retries a function up to retries attempts when it raises
+    a transient sqlite3.Error, backing off exponentially from delay seconds
+    (capped at max_delay) with full jitter. max_elapsed bounds the total time
+    spent. Non-transient errors are raised immediately. Coroutine functions
+    get an async wrapper that backs off with asyncio.sleep.
+    """
     def decorator(func):
+        with _stats_lock:
+            stats = retry_stats.setdefault(func.__qualname__, {
+                "calls": 0, "retries": 0, "backoff_time": 0.0, "exhausted": 0,
+            })
+
+        def next_sleep(error, attempt, started):
+            # Returns how long to back off, or None to stop retrying
+            if not retry_if(error):
+                return None
+            if attempt + 1 >= retries:
+                return None
+            sleep = _backoff(attempt, delay, max_delay)
+            if max_elapsed is not None:
+                remaining = max_elapsed - (time.monotonic() - started)
+                if remaining <= 0:
+                    return None
+                sleep = min(sleep, remaining)
+            print(f"{error}\n Retrying in {sleep:.2f}s ...")
+            _count(stats, "retries")
+            _count(stats, "backoff_time", sleep)
+            return sleep
+
+        def give_up(error):
+            if retry_if(error):
+                _count(stats, "exhausted")
+                print(f"All {retries} attempts have been exhausted for {func.__name__}.")
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                _count(stats, "calls")
+                started = time.monotonic()
+                attempt = 0
+                while True:
+                    try:
+                        return await func(*args, **kwargs)
+                    except sqlite3.Error as e:
+                        sleep = next_sleep(e, attempt, started)
+                        if sleep is None:
+                            give_up(e)
+                            raise
+                    await asyncio.sleep(sleep)
+                    attempt += 1
+            return async_wrapper
+
         @functools.wraps(func)
-        def wrapper( *args, **kwargs):
-            attempts = 0
-            while attempts < retries:
+        def wrapper(*args, **kwargs):
+            _count(stats, "calls")
+            started = time.monotonic()
+            attempt = 0
+            while True:
                 try:
-
                     return func(*args, **kwargs)
-
                 except sqlite3.Error as e:
-                    print(f"{e}/n Retrying ...")
-                    if attempts < retries: 
-                            time.sleep(1)
-                            attempts += 1
-            print(f"All {retries} have been exhausted for {func.__name__}.")
-            
-            
+                    sleep = next_sleep(e, attempt, started)
+                    if sleep is None:
+                        give_up(e)
+                        raise
+                time.sleep(sleep)
+                attempt += 1
+
         return wrapper
     return decorator
  
@@ -50,4 +145,5 @@ def fetch_users_with_retry(conn):
 
 #### attempt to fetch users with automatic retry on failure
 users = fetch_users_with_retry()
-print(users)
\ No newline at end of file
+print(users)
+print(retry_stats)
\ No newline at end of file
@@ -62,8 +62,15 @@ import sqlite3
 import functools
 import time
 
-# Global cache dictionary
-query_cache = {}
+import cache_store
+import db_connections
+from fingerprint import fingerprint
+
+# Global cache: bounded LRU with a TTL and a byte budget, invalidated by
+# writes that go through transactional. Entries up to a minute past their
+# TTL are served while a background refresh runs
+query_cache = cache_store.QueryCache(max_entries=256, max_bytes=16 * 1024 * 1024,
+                                     ttl=300, stale_ttl=60)
 
 def with_db_connection(func):
     """
@@ -75,39 +82,78 @@ def with_db_connection(func):
         conn = None
         result = None
         try:
-            conn = sqlite3.connect('users.db')
+            conn = db_connections.connect()
             result = func(conn, *args, **kwargs)
         except sqlite3.Error as e:
             print(f"Database error: {e}")
             raise
         finally:
             if conn:
-                conn.close()
+                db_connections.release(conn)
         return result
     return wrapper
 
+def _param_values(params):
+    # Named parameters are keyed on their names and values, not just names
+    if not params:
+        return ()
+    if isinstance(params, dict):
+        return tuple(sorted(params.items()))
+    return tuple(params)
+
 def cache_query(func):
     """
     Decorator to cache the results of database queries.
-    Caches based on the SQL query string and its parameters.
+    Caches based on the query fingerprint, its literals and its parameters,
+    so differently formatted copies of the same query share an entry.
+    Write statements are never cached; they invalidate the table they touch.
+    Queries whose tables cannot be determined are run without the cache.
+    Concurrent misses on the same key execute the query only once.
     """
     @functools.wraps(func)
     def wrapper(conn, query, params=None, *args, **kwargs):
-        # Create a unique cache key that includes both the query and its parameters
-        cache_key = (query, tuple(params) if params else ())
+        written = cache_store.table_written(query)
+        if written:
+            result = func(conn, query, params, *args, **kwargs)
+            cache_store.invalidate_tables({written})
+            return result
 
-        if cache_key in query_cache:
-            print(f"Cache hit! Returning cached result for query: '{query[:70]}...'")
-            return query_cache[cache_key]
-        else:
+        # Without knowing every table it reads, no write could invalidate
+        # the entry, so the query is run uncached
+        tables = cache_store.tables_read(query)
+        if tables is None:
+            return func(conn, query, params, *args, **kwargs)
+
+        # Create a unique cache key from the normalized query and its values
+        query_fingerprint = fingerprint(query)
+        cache_key = (query_fingerprint.key, query_fingerprint.literals,
+                     _param_values(params))
+
+        executed = []
+
+        def load():
             print(f"Cache miss. Executing query: '{query[:70]}...'")
+            executed.append(True)
             # Execute the original function, passing all relevant arguments
             # This line ensures 'query' and 'params' are passed to 'fetch_users_with_cache'
-            result = func(conn, query, params, *args, **kwargs)
-            
-            query_cache[cache_key] = result
-            return result
-            
+            return func(conn, query, params, *args, **kwargs)
+
+        def refresh():
+            # The caller's connection is released as soon as it returns, so a
+            # background refresh of a stale entry opens its own
+            refresh_conn = db_connections.connect()
+            try:
+                return func(refresh_conn, query, params, *args, **kwargs)
+            finally:
+                db_connections.release(refresh_conn)
+
+        result = query_cache.get_or_load(cache_key, load,
+                                         tables=tables,
+                                         refresh=refresh)
+        if not executed:
+            print(f"Cache hit! Returning cached result for query: '{query[:70]}...'")
+        return result
+
     return wrapper
 
 @with_db_connection
@@ -123,4 +169,5 @@ users = fetch_users_with_cache(query="SELECT * FROM users")
 #### Second call will use the cached result
 users_again = fetch_users_with_cache(query="SELECT * FROM users")
 
-print(query_cache.items())
\ No newline at end of file
+print(query_cache.items())
+print(query_cache.stats())
\ No newline at end of file
@@ -0,0 +1,364 @@
+import pickle
+import re
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future
+
+MISSING = object()
+
+FRESH = "fresh"
+STALE = "stale"
+
+_TOKENS = re.compile(r"""
+    --[^\n]*|/\*.*?\*/|'(?:[^']|'')*'
+  | "(?:[^"]|"")*"|`[^`]*`|\[[^\]]*\]
+  | \w+|\S
+""", re.DOTALL | re.VERBOSE)
+# Words that end a FROM item, so they are never taken for an alias
+_CLAUSE_WORDS = frozenset("""
+    where group order limit having window union except intersect join inner
+    left right full cross natural outer on using indexed not returning
+""".split())
+_WRITTEN_TABLE = re.compile(
+    r"^\s*(?:insert(?:\s+or\s+\w+)?\s+into|replace\s+into"
+    r"|update(?:\s+or\s+\w+)?|delete\s+from)\s+"
+    r"(?:[`\"\[]?\w+[`\"\]]?\s*\.\s*)?[`\"\[]?(\w+)",
+    re.IGNORECASE,
+)
+
+_caches = weakref.WeakSet()
+
+
+def _identifier(token):
+    if token[0] in "\"`[":
+        return token[1:-1]
+    if token[0].isalpha() or token[0] == "_":
+        return token
+    return None
+
+
+def _from_items(tokens, i, tables):
+    # Reads the comma-separated items after FROM or JOIN starting at
+    # tokens[i]; returns the index after them, or None if unsure
+    while True:
+        if i < len(tokens) and tokens[i] == "(":
+            depth, end = 1, i + 1
+            while end < len(tokens) and depth:
+                depth += {"(": 1, ")": -1}.get(tokens[end], 0)
+                end += 1
+            inner = _read_tables(tokens[i + 1:end - 1])
+            if inner is None:
+                return None
+            tables |= inner
+            i = end
+        else:
+            name = _identifier(tokens[i]) if i < len(tokens) else None
+            if name is None:
+                return None
+            i += 1
+            # schema.table: keep the table
+            if i + 1 < len(tokens) and tokens[i] == ".":
+                name = _identifier(tokens[i + 1])
+                if name is None:
+                    return None
+                i += 2
+            if i < len(tokens) and tokens[i] == "(":
+                # Table-valued function: what it reads is unknown
+                return None
+            tables.add(name.lower())
+        if i < len(tokens) and tokens[i].lower() == "as":
+            i += 2
+        elif i < len(tokens) and _identifier(tokens[i]) \
+                and tokens[i].lower() not in _CLAUSE_WORDS:
+            i += 1
+        if i < len(tokens) and tokens[i] == ",":
+            i += 1
+            continue
+        return i
+
+
+def _read_tables(tokens):
+    tables = set()
+    i = 0
+    while i < len(tokens):
+        word = tokens[i].lower()
+        i += 1
+        if word in ("from", "join"):
+            i = _from_items(tokens, i, tables)
+            if i is None:
+                return None
+    return tables
+
+
+def tables_read(query):
+    """
+    Returns the lower-cased names of the tables a SELECT reads from,
+    including comma-separated FROM lists, joins and subqueries, with any
+    schema qualifier dropped. Returns None when they cannot be told
+    reliably (e.g. a table-valued function), so the result is not cached.
+    """
+    tokens = [token for token in _TOKENS.findall(query)
+              if not token.startswith(("--", "/*", "'"))]
+    return _read_tables(tokens)
+
+
+def table_written(statement):
+    """
+    Returns the lower-cased table an INSERT/UPDATE/DELETE writes to, or None.
+    """
+    match = _WRITTEN_TABLE.match(statement)
+    return match.group(1).lower() if match else None
+
+
+def invalidate_tables(tables):
+    """
+    Drops every entry that reads from any of tables, in every live cache.
+    """
+    tables = {name.lower() for name in tables}
+    if tables:
+        for cache in list(_caches):
+            cache.invalidate_tables(tables)
+
+
+def invalidate_statements(statements):
+    """
+    Invalidates the tables written by a list of executed SQL statements.
+    """
+    invalidate_tables({table for table in map(table_written, statements) if table})
+
+
+def _sizeof(value):
+    try:
+        return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class _Entry:
+    __slots__ = ("value", "expires", "size", "tables", "hits")
+
+    def __init__(self, value, expires, size, tables):
+        self.value = value
+        self.expires = expires
+        self.size = size
+        self.tables = tables
+        self.hits = 0
+
+
+class QueryCache:
+    """
+    A thread-safe query result cache bounded by entry count and by the
+    pickled size of the results, with an optional per-entry TTL.
+
+    policy is "lru" (evict the least recently used entry) or "lfu" (evict
+    the entry with the fewest hits). Entries remember which tables their
+    query reads so writes can invalidate them.
+
+    get_or_load runs concurrent misses on the same key only once. With
+    stale_ttl, an entry that expired less than stale_ttl seconds ago is
+    still served by get_or_load while a single background refresh runs.
+    A load or refresh whose tables are invalidated while it runs returns
+    its result to the caller but does not store it.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=None, ttl=None, policy="lru",
+                 stale_ttl=None):
+        if policy not in ("lru", "lfu"):
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.policy = policy
+        self.stale_ttl = stale_ttl
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._refreshing = set()
+        self._generations = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+            "stale_hits": 0,
+            "coalesced": 0,
+            "refreshes": 0,
+        }
+        _caches.add(self)
+
+    def _lookup(self, key):
+        # Returns (entry, FRESH | STALE) or (None, None); caller holds the lock
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, None
+        if entry.expires is None or entry.expires > time.monotonic():
+            return entry, FRESH
+        if self.stale_ttl is not None \
+                and entry.expires + self.stale_ttl > time.monotonic():
+            return entry, STALE
+        self._remove(key)
+        self._stats["expirations"] += 1
+        return None, None
+
+    def _hit(self, key, entry):
+        self._entries.move_to_end(key)
+        entry.hits += 1
+        self._stats["hits"] += 1
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            entry, state = self._lookup(key)
+            if state is not FRESH:
+                self._stats["misses"] += 1
+                return default
+            self._hit(key, entry)
+            return entry.value
+
+    def _generation(self, tables):
+        # Caller holds the lock
+        return tuple(self._generations.get(name, 0) for name in tables)
+
+    def _store(self, key, value, tables, generation):
+        # Drops results loaded across an invalidation of their tables
+        with self._lock:
+            if self._generation(tables) == generation:
+                self.set(key, value, tables)
+
+    def get_or_load(self, key, load, tables=(), refresh=None):
+        """
+        Returns the cached value for key, calling load() on a miss. Threads
+        that miss while another thread is loading the same key wait for its
+        result instead of loading again. A stale entry is returned at once
+        and refreshed in the background with refresh (default: load).
+        """
+        tables = tuple(sorted({name.lower() for name in tables}))
+        with self._lock:
+            entry, state = self._lookup(key)
+            if state is not None:
+                self._hit(key, entry)
+                if state is STALE:
+                    self._stats["stale_hits"] += 1
+                    self._start_refresh(key, refresh or load, tables)
+                return entry.value
+            flight, _ = self._inflight.get(key, (None, None))
+            leader = flight is None
+            if leader:
+                flight = Future()
+                self._inflight[key] = (flight, frozenset(tables))
+                self._stats["misses"] += 1
+                generation = self._generation(tables)
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            return flight.result()
+        try:
+            value = load()
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        else:
+            self._store(key, value, tables, generation)
+            flight.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                if self._inflight.get(key, (None,))[0] is flight:
+                    del self._inflight[key]
+
+    def _start_refresh(self, key, load, tables):
+        # Caller holds the lock
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        self._stats["refreshes"] += 1
+        generation = self._generation(tables)
+
+        def run():
+            try:
+                self._store(key, load(), tables, generation)
+            except Exception as e:
+                print(f"Background refresh failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def set(self, key, value, tables=(), ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        expires = time.monotonic() + ttl if ttl is not None else None
+        size = _sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._entries[key] = _Entry(value, expires, size,
+                                        frozenset(name.lower() for name in tables))
+            self._bytes += size
+            self._evict()
+
+    def invalidate(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                self._stats["invalidations"] += 1
+
+    def invalidate_tables(self, tables):
+        with self._lock:
+            for name in tables:
+                self._generations[name] = self._generations.get(name, 0) + 1
+            # Misses from now on start a fresh load instead of waiting for
+            # one that may have read the old rows
+            for key, (_, flight_tables) in list(self._inflight.items()):
+                if flight_tables & tables:
+                    del self._inflight[key]
+            stale = [key for key, entry in self._entries.items()
+                     if entry.tables & tables]
+            for key in stale:
+                self._remove(key)
+            self._stats["invalidations"] += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+        return stats
+
+    def items(self):
+        with self._lock:
+            return [(key, entry.value) for key, entry in self._entries.items()]
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._lookup(key)[1] is FRESH
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def _evict(self):
+        while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            if self.policy == "lfu":
+                key = min(self._entries, key=lambda k: self._entries[k].hits)
+            else:
+                key = next(iter(self._entries))
+            self._remove(key)
+            self._stats["evictions"] += 1
@@ -0,0 +1,126 @@
+"""
+Connection provider shared by the with_db_connection decorators.
+
+By default every call opens and closes its own connection, as before. With
+configure(reuse=True) each thread keeps one open connection per database
+path, tuned with PRAGMAs the first time it is opened and with a larger
+prepared-statement cache. A nested call made while that connection is
+checked out gets a connection of its own, so its commit or rollback never
+touches the outer call's transaction.
+"""
+import sqlite3
+import threading
+
+DEFAULT_PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("mmap_size", 256 * 1024 * 1024),
+    ("cache_size", -64 * 1024),
+)
+
+_settings = {
+    "db_path": "users.db",
+    "reuse": False,
+    "pragmas": DEFAULT_PRAGMAS,
+    "cached_statements": 512,
+}
+_stats = {"opened": 0, "reused": 0, "closed": 0}
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def configure(db_path=None, reuse=None, pragmas=None, cached_statements=None):
+    """
+    Changes the database path, turns reuse mode on or off, or replaces the
+    PRAGMAs and statement cache size applied to reused connections.
+    """
+    if db_path is not None:
+        _settings["db_path"] = db_path
+    if reuse is not None:
+        _settings["reuse"] = reuse
+    if pragmas is not None:
+        _settings["pragmas"] = tuple(pragmas)
+    if cached_statements is not None:
+        _settings["cached_statements"] = cached_statements
+
+
+def database_path():
+    return _settings["db_path"]
+
+
+def _count(name):
+    with _lock:
+        _stats[name] += 1
+
+
+def _open(db_path, pragmas=(), cached_statements=128):
+    conn = sqlite3.connect(db_path, cached_statements=cached_statements)
+    for name, value in pragmas:
+        conn.execute(f"PRAGMA {name} = {value}")
+    _count("opened")
+    return conn
+
+
+def _thread_connections():
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    return connections
+
+
+def _checked_out():
+    checked_out = getattr(_local, "checked_out", None)
+    if checked_out is None:
+        checked_out = _local.checked_out = set()
+    return checked_out
+
+
+def connect(db_path=None):
+    db_path = db_path or _settings["db_path"]
+    if not _settings["reuse"]:
+        return _open(db_path)
+
+    connections = _thread_connections()
+    checked_out = _checked_out()
+    conn = connections.get(db_path)
+    if conn is None:
+        conn = connections[db_path] = _open(db_path, _settings["pragmas"],
+                                            _settings["cached_statements"])
+    elif conn in checked_out:
+        # Nested call: the outer call may have a transaction open
+        return _open(db_path, _settings["pragmas"], _settings["cached_statements"])
+    else:
+        _count("reused")
+    checked_out.add(conn)
+    return conn
+
+
+def release(conn):
+    """
+    Hands a connection back. Reused connections stay open, but anything
+    left uncommitted is rolled back just as closing would discard it.
+    """
+    if conn in _thread_connections().values():
+        _checked_out().discard(conn)
+        if conn.in_transaction:
+            conn.rollback()
+        return
+    conn.close()
+    _count("closed")
+
+
+def close_all():
+    """
+    Closes the calling thread's reused connections.
+    """
+    connections = _thread_connections()
+    for conn in connections.values():
+        conn.close()
+        _count("closed")
+    connections.clear()
+    _checked_out().clear()
+
+
+def stats():
+    with _lock:
+        return dict(_stats)
@@ -0,0 +1,78 @@
+import functools
+import hashlib
+import re
+
+_TOKEN = re.compile(r"""
+    (?P<comment>--[^\n]*|/\*.*?\*/)
+  | (?P<string>'(?:[^']|'')*')
+  | (?P<quoted>"(?:[^"]|"")*"|`[^`]*`|\[[^\]]*\])
+  | (?P<number>0[xX][0-9a-fA-F]+|(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<param>\?\d*|[:@$]\w+)
+  | (?P<word>\w+)
+  | (?P<space>\s+)
+  | (?P<other>.)
+""", re.DOTALL | re.VERBOSE)
+
+_IN_LIST = re.compile(r"\( \?(?: , \?)+ \)")
+
+
+class Fingerprint:
+    """
+    A normalized SQL statement: template has comments dropped, whitespace
+    collapsed, words lower-cased, literals and placeholders replaced by ?
+    and IN-lists collapsed; literals holds the replaced values in order and
+    digest is a short hash of template, for grouping similar statements.
+
+    key is a hash of the same normalization without the IN-list collapse
+    and with placeholder names kept, so together with literals it only
+    matches statements that are equivalent.
+    """
+    __slots__ = ("template", "literals", "digest", "key")
+
+    def __init__(self, template, literals, digest, key):
+        self.template = template
+        self.literals = literals
+        self.digest = digest
+        self.key = key
+
+    def __repr__(self):
+        return f"Fingerprint({self.digest!r}, {self.template!r})"
+
+
+@functools.lru_cache(maxsize=4096)
+def fingerprint(query):
+    """
+    Fingerprints a SQL statement. Results are cached, so repeated calls
+    with the same query text are a dictionary lookup.
+
+    >>> fingerprint("SELECT *  FROM users WHERE id = 3").template
+    'select * from users where id = ?'
+    """
+    tokens = []
+    exact = []
+    literals = []
+    for match in _TOKEN.finditer(query):
+        kind = match.lastgroup
+        text = match.group()
+        if kind in ("comment", "space"):
+            continue
+        if kind in ("string", "number"):
+            literals.append(text)
+            tokens.append("?")
+            exact.append("?")
+        elif kind == "param":
+            tokens.append("?")
+            exact.append(text)
+        elif kind == "word":
+            tokens.append(text.lower())
+            exact.append(text.lower())
+        else:
+            tokens.append(text)
+            exact.append(text)
+    template = _IN_LIST.sub("( ?+ )", " ".join(tokens))
+    return Fingerprint(template, tuple(literals), _hash(template),
+                       _hash(" ".join(exact)))
+
+
+def _hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
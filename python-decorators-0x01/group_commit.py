@@ -0,0 +1,230 @@
+"""
+Group commit: writes submitted from many calls (and threads) are run by one
+writer thread and committed together, one transaction per batch.
+"""
+import functools
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+import cache_store
+import db_connections
+
+_STOP = object()
+
+
+class _WriteConnection:
+    """
+    The connection handed to a queued write. The batch owns the
+    transaction, so commit and rollback raise inside the write's savepoint:
+    that write fails and is rolled back, and the rest of the batch is
+    unaffected.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def commit(self):
+        raise sqlite3.ProgrammingError(
+            "group_commit writes are committed with their batch; "
+            "do not call commit()")
+
+    def rollback(self):
+        raise sqlite3.ProgrammingError(
+            "group_commit writes cannot roll back the batch; raise instead")
+
+    # "with conn:" would commit or roll back on exit; inside a savepoint
+    # the batch already does both, so the block just runs
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class GroupCommitter:
+    """
+    Collects write functions and commits them in batches of up to
+    max_batch writes, or whatever arrived within max_delay seconds of the
+    first write in the batch.
+
+    Each write runs inside its own SAVEPOINT, so a failing write is rolled
+    back on its own and only its caller sees the error. If the batch itself
+    fails (BEGIN, COMMIT or a savepoint cannot run) every write in it gets
+    the error, and writes still queued when the writer stops are failed
+    rather than left waiting.
+    """
+
+    def __init__(self, db_path=None, max_batch=100, max_delay=0.005):
+        self.db_path = db_path or db_connections.database_path()
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._stats = {"writes": 0, "failed": 0, "batches": 0, "commits_failed": 0}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, daemon=True)
+        self._writer.start()
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Queues func(conn, *args, **kwargs) and returns a Future that
+        resolves to its result once the batch holding it has committed.
+        """
+        future = Future()
+        with self._lock:
+            # Queued under the lock so the writer's final drain sees it
+            if self._closed:
+                raise RuntimeError("GroupCommitter is closed")
+            self._queue.put((future, func, args, kwargs))
+        return future
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._queue.put(_STOP)
+        self._writer.join()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _run(self):
+        conn = None
+        try:
+            conn = sqlite3.connect(self.db_path, isolation_level=None)
+            stopping = False
+            while not stopping:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                batch = [item]
+                deadline = time.monotonic() + self.max_delay
+                while len(batch) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                self._flush(conn, batch)
+        except BaseException as e:
+            print(f"Group commit writer stopped: {e}")
+            self._close_queue(e)
+        else:
+            self._close_queue(RuntimeError("GroupCommitter is closed"))
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _close_queue(self, error):
+        # Fails every write still queued so no caller waits forever
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP and not item[0].done():
+                item[0].set_exception(error)
+
+    def _flush(self, conn, batch):
+        statements = []
+        outcomes = []
+        conn.set_trace_callback(statements.append)
+        try:
+            conn.execute("BEGIN")
+            for future, func, args, kwargs in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                conn.execute("SAVEPOINT group_write")
+                try:
+                    result = func(_WriteConnection(conn), *args, **kwargs)
+                except Exception as e:
+                    try:
+                        conn.execute("ROLLBACK TO group_write")
+                        conn.execute("RELEASE group_write")
+                    except sqlite3.Error:
+                        # The write ended the transaction itself (e.g. INSERT
+                        # OR ROLLBACK); it keeps its own error, the rest of
+                        # the batch fails below
+                        future.set_exception(e)
+                        raise
+                    outcomes.append((future, e, False))
+                else:
+                    conn.execute("RELEASE group_write")
+                    outcomes.append((future, result, True))
+            conn.execute("COMMIT")
+        except BaseException as e:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except sqlite3.Error:
+                pass
+            with self._lock:
+                self._stats["commits_failed"] += 1
+            # Started and not-yet-started writes alike, so none is stranded
+            for future, _, _, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            conn.set_trace_callback(None)
+
+        cache_store.invalidate_statements(statements)
+        with self._lock:
+            self._stats["batches"] += 1
+            for future, value, ok in outcomes:
+                self._stats["writes" if ok else "failed"] += 1
+        for future, value, ok in outcomes:
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_committer():
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = GroupCommitter()
+        return _default
+
+
+def group_commit(func=None, *, committer=None, wait=True):
+    """
+    Decorator that routes a write function through a GroupCommitter instead
+    of committing it on its own. The caller blocks until its batch commits
+    and gets the function's result, or its exception; with wait=False the
+    Future is returned instead.
+    """
+    if func is None:
+        return functools.partial(group_commit, committer=committer, wait=wait)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        future = (committer or default_committer()).submit(func, *args, **kwargs)
+        return future.result() if wait else future
+
+    return wrapper
@@ -0,0 +1,210 @@
+"""
+Slow-query profiler for the decorated database functions: per-function and
+per-query latency percentiles, with EXPLAIN QUERY PLAN captured for queries
+that run slower than a threshold.
+"""
+import functools
+import itertools
+import math
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from fingerprint import fingerprint
+
+
+class LatencyStats:
+    """
+    Count, total and maximum of a latency series, plus its most recent
+    samples for computing percentiles.
+    """
+
+    def __init__(self, max_samples=10000):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=max_samples)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.samples.append(seconds)
+
+    def percentile(self, percentile):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        rank = max(1, math.ceil(percentile / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+class Profiler:
+    def __init__(self, threshold=0.1, explain=True):
+        self.threshold = threshold
+        self.explain = explain
+        self.functions = {}
+        self.queries = {}
+        self.templates = {}
+        self.slow = {}
+        self.plans = {}
+        self._lock = threading.Lock()
+
+    def record_function(self, name, seconds):
+        with self._lock:
+            self.functions.setdefault(name, LatencyStats()).add(seconds)
+
+    def record_query(self, conn, sql, params, seconds):
+        query_fingerprint = fingerprint(sql)
+        key = query_fingerprint.digest
+        with self._lock:
+            self.queries.setdefault(key, LatencyStats()).add(seconds)
+            self.templates[key] = query_fingerprint.template
+            if seconds < self.threshold:
+                return
+            self.slow[key] = self.slow.get(key, 0) + 1
+            needs_plan = self.explain and key not in self.plans
+            if needs_plan:
+                self.plans[key] = None
+        if needs_plan:
+            self.plans[key] = explain_query_plan(conn, sql, params)
+
+    def reset(self):
+        with self._lock:
+            for table in (self.functions, self.queries, self.templates,
+                          self.slow, self.plans):
+                table.clear()
+
+    def report(self, top=10, file=None):
+        """
+        Prints the top functions and queries by p95 latency, with the query
+        plan of every query that crossed the slow threshold.
+        """
+        with self._lock:
+            functions = {name: s.summary() for name, s in self.functions.items()}
+            queries = {key: s.summary() for key, s in self.queries.items()}
+
+        def ranked(rows):
+            return sorted(rows.items(), key=lambda item: item[1]["p95"], reverse=True)[:top]
+
+        print("Functions (p50 / p95 / p99 ms, calls):", file=file)
+        for name, s in ranked(functions):
+            print(f"  {name}: {s['p50'] * 1000:.2f} / {s['p95'] * 1000:.2f} / "
+                  f"{s['p99'] * 1000:.2f}, {s['count']}", file=file)
+        print("Queries (p50 / p95 / p99 ms, calls, slow):", file=file)
+        for key, s in ranked(queries):
+            print(f"  [{key}] {self.templates[key]}", file=file)
+            print(f"    {s['p50'] * 1000:.2f} / {s['p95'] * 1000:.2f} / "
+                  f"{s['p99'] * 1000:.2f}, {s['count']}, {self.slow.get(key, 0)}",
+                  file=file)
+            for detail in self.plans.get(key) or ():
+                print(f"    plan: {detail}", file=file)
+
+
+def explain_query_plan(conn, sql, params=()):
+    try:
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params or ()).fetchall()
+    except sqlite3.Error as e:
+        return [f"EXPLAIN failed: {e}"]
+    return [row[-1] for row in rows]
+
+
+class _TimedCursor:
+    def __init__(self, cursor, conn, profiler):
+        self._cursor = cursor
+        self._conn = conn
+        self._profiler = profiler
+
+    def execute(self, sql, params=()):
+        started = time.perf_counter()
+        self._cursor.execute(sql, params)
+        self._profiler.record_query(self._conn, sql, params,
+                                    time.perf_counter() - started)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        # Peek at the first parameter set so EXPLAIN can bind it
+        seq_of_params = iter(seq_of_params)
+        first = next(seq_of_params, None)
+        if first is not None:
+            seq_of_params = itertools.chain((first,), seq_of_params)
+        started = time.perf_counter()
+        self._cursor.executemany(sql, seq_of_params)
+        self._profiler.record_query(self._conn, sql, first,
+                                    time.perf_counter() - started)
+        return self
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class _TimedConnection:
+    def __init__(self, conn, profiler):
+        self._conn = conn
+        self._profiler = profiler
+
+    def cursor(self, *args, **kwargs):
+        return _TimedCursor(self._conn.cursor(*args, **kwargs), self._conn,
+                            self._profiler)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+    # Dunder methods are looked up on the type, so __getattr__ does not
+    # forward them; "with conn:" needs these to commit or roll back
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._conn.__exit__(exc_type, exc, tb)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+default_profiler = Profiler()
+
+
+def profile_queries(func=None, *, profiler=None):
+    """
+    Decorator that times the wrapped function and, when its first argument
+    is a sqlite3 connection, every statement it executes through it.
+    Apply it below with_db_connection so it receives the connection.
+    """
+    if func is None:
+        return functools.partial(profile_queries, profiler=profiler)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        active = profiler or default_profiler
+        if args and isinstance(args[0], sqlite3.Connection):
+            args = (_TimedConnection(args[0], active),) + args[1:]
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            active.record_function(func.__qualname__, time.perf_counter() - started)
+
+    return wrapper
+
+
+def report(top=10, file=None):
+    default_profiler.report(top=top, file=file)
@@ -0,0 +1,187 @@
+"""
+Low-overhead query logging: the decorated call only appends a record to an
+in-memory ring buffer, and a background thread writes buffered records to
+the logs table in batches.
+"""
+import atexit
+import functools
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import db_connections
+from fingerprint import fingerprint
+
+LOG_COLUMNS = (
+    ("duration_ms", "REAL"),
+    ("row_count", "INTEGER"),
+    ("fingerprint", "TEXT"),
+)
+
+CREATE_LOGS_SQL = """
+    CREATE TABLE IF NOT EXISTS logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT NOT NULL,
+        function_name TEXT NOT NULL,
+        query_type TEXT,
+        message TEXT
+    )
+"""
+
+INSERT_LOG_SQL = (
+    "INSERT INTO logs (timestamp, function_name, query_type, message, "
+    "duration_ms, row_count, fingerprint) VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+class QueryLogger:
+    """
+    Buffers up to capacity log records and flushes them every
+    flush_interval seconds. A deque with maxlen is used as the ring buffer:
+    appends and pops are atomic, so callers never take a lock, and when the
+    writer falls behind the oldest records are dropped instead of blocking.
+    """
+
+    def __init__(self, db_path=None, capacity=10000, flush_interval=1.0,
+                 batch_size=500):
+        self.db_path = db_path or db_connections.database_path()
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._buffer = deque(maxlen=capacity)
+        # A batch whose insert failed; written before anything newer
+        self._unwritten = []
+        self._wake = threading.Event()
+        self._stopped = False
+        self._stats = {"logged": 0, "written": 0, "dropped": 0}
+        self._writer = threading.Thread(target=self._run, daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def log(self, function_name, query, duration, row_count):
+        query_fingerprint = fingerprint(query)
+        query_type = query_fingerprint.template.split(" ", 1)[0].upper()
+        if len(self._buffer) == self.capacity:
+            self._stats["dropped"] += 1
+        self._buffer.append((
+            datetime.now().isoformat(), function_name, query_type,
+            query_fingerprint.template, duration * 1000, row_count,
+            query_fingerprint.digest,
+        ))
+        self._stats["logged"] += 1
+
+    def flush(self, conn):
+        while self._unwritten or self._buffer:
+            batch = self._unwritten
+            while self._buffer and len(batch) < self.batch_size:
+                batch.append(self._buffer.popleft())
+            # Held until the commit succeeds, so a failed insert (e.g.
+            # "database is locked") is retried on the next flush
+            self._unwritten = batch
+            try:
+                conn.executemany(INSERT_LOG_SQL, batch)
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+            self._unwritten = []
+            self._stats["written"] += len(batch)
+
+    def close(self):
+        if not self._stopped:
+            self._stopped = True
+            self._wake.set()
+            self._writer.join()
+
+    def stats(self):
+        stats = dict(self._stats)
+        stats["buffered"] = len(self._buffer) + len(self._unwritten)
+        return stats
+
+    def _run(self):
+        conn = sqlite3.connect(self.db_path)
+        ready = False
+        try:
+            while True:
+                stopping = self._stopped
+                if not stopping:
+                    self._wake.wait(self.flush_interval)
+                # Setup and flush errors are retried on the next interval
+                # so the writer thread keeps running
+                try:
+                    if not ready:
+                        ensure_log_columns(conn)
+                        ready = True
+                    self.flush(conn)
+                except sqlite3.Error as e:
+                    print(f"Query log flush failed: {e}")
+                    if stopping:
+                        lost = len(self._unwritten) + len(self._buffer)
+                        self._stats["dropped"] += lost
+                        print(f"Query log dropped {lost} unwritten records")
+                if stopping:
+                    break
+        finally:
+            conn.close()
+
+
+def ensure_log_columns(conn):
+    """
+    Creates the logs table if it is missing and adds the timing columns to
+    one created before they existed.
+    """
+    conn.execute(CREATE_LOGS_SQL)
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(logs)")}
+    for name, column_type in LOG_COLUMNS:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE logs ADD COLUMN {name} {column_type}")
+    conn.commit()
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_logger():
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = QueryLogger()
+        return _default
+
+
+def _find_query(args, kwargs):
+    query = kwargs.get("query")
+    if query is None:
+        query = next((arg for arg in args if isinstance(arg, str)), None)
+    return query
+
+
+def log_queries(func=None, *, sample_rate=1.0, logger=None):
+    """
+    Decorator that logs the query passed to func together with its duration,
+    row count (when func returns a list of rows) and fingerprint. With sample_rate below 1 only that fraction
+    of calls is timed and logged; the rest run untouched.
+    """
+    if func is None:
+        return functools.partial(log_queries, sample_rate=sample_rate, logger=logger)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if sample_rate < 1.0 and random.random() >= sample_rate:
+            return func(*args, **kwargs)
+        query = _find_query(args, kwargs)
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        duration = time.perf_counter() - started
+        if query is not None:
+            # fetchall() returns a list of rows; a fetchone() tuple is one
+            # row, and len() of it would be its column count
+            row_count = len(result) if isinstance(result, list) else None
+            (logger or default_logger()).log(func.__name__, query, duration, row_count)
+        return result
+
+    return wrapper
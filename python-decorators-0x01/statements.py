@@ -0,0 +1,130 @@
+"""
+Batching for functions that run the same parameterized statement call after
+call: passing batch=[args, ...] runs them all on one connection, writes as
+a single executemany.
+"""
+import functools
+
+import cache_store
+
+
+class _NotBatchable(Exception):
+    """
+    Raised by the capture connection when a function does anything other
+    than run write statements.
+    """
+
+
+class _CaptureCursor:
+    """
+    Records the write statements a function executes instead of running
+    them. Reads abort the capture.
+    """
+
+    def __init__(self, capture):
+        self._capture = capture
+
+    # Nothing has run yet, so results that depend on the statement cannot
+    # be answered; the batch is run per entry instead
+    @property
+    def rowcount(self):
+        raise _NotBatchable("rowcount")
+
+    @property
+    def lastrowid(self):
+        raise _NotBatchable("lastrowid")
+
+    def execute(self, sql, params=()):
+        if not cache_store.table_written(sql):
+            raise _NotBatchable(sql)
+        # Named parameters are kept as a dict; tuple() would keep the names
+        if not isinstance(params, dict):
+            params = tuple(params)
+        self._capture.statements.append((sql, params))
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        for params in seq_of_params:
+            self.execute(sql, params)
+        return self
+
+    def _fetched(self, *args, **kwargs):
+        raise _NotBatchable("fetch")
+
+    fetchone = fetchmany = fetchall = __iter__ = _fetched
+
+    def close(self):
+        pass
+
+
+class _CaptureConnection:
+    """
+    Stands in for a connection during the capture pass. Anything beyond
+    cursor/execute/executemany (commit, row_factory, ...) raises
+    AttributeError, which sends the batch down the per-entry path.
+    """
+
+    def __init__(self):
+        self.statements = []
+
+    def cursor(self, *args, **kwargs):
+        return _CaptureCursor(self)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+
+def _as_args(item):
+    return item if isinstance(item, (tuple, list)) else (item,)
+
+
+def batchable(func=None, *, batch_fetch=None):
+    """
+    Decorator for func(conn, *args). Called normally it behaves as before;
+    called with batch=[args, ...] it runs every entry on the same
+    connection and returns the list of results.
+
+    batch_fetch(conn, items, **kwargs), if given, answers the whole batch
+    itself, e.g. with one IN query; items is the list of argument tuples.
+
+    Otherwise func is run against a capture connection. When every call
+    only writes, the captured statements are sent with one executemany per
+    statement, so a bulk update is one round trip. The capture stops at the
+    first read, commit or other use of the connection it cannot record,
+    and the entries are then run one by one on the shared connection;
+    anything func did before that point in the capture pass runs twice.
+    """
+    if func is None:
+        return functools.partial(batchable, batch_fetch=batch_fetch)
+
+    @functools.wraps(func)
+    def wrapper(conn, *args, batch=None, **kwargs):
+        if batch is None:
+            return func(conn, *args, **kwargs)
+
+        items = [_as_args(item) for item in batch]
+        if batch_fetch is not None:
+            return batch_fetch(conn, items, **kwargs)
+
+        capture = _CaptureConnection()
+        try:
+            results = [func(capture, *item, **kwargs) for item in items]
+        except (_NotBatchable, AttributeError):
+            return [func(conn, *item, **kwargs) for item in items]
+
+        runs = []
+        for sql, params in capture.statements:
+            if runs and runs[-1][0] == sql:
+                runs[-1][1].append(params)
+            else:
+                runs.append((sql, [params]))
+        cursor = conn.cursor()
+        for sql, params_list in runs:
+            cursor.executemany(sql, params_list)
+        cursor.close()
+        return results
+
+    return wrapper
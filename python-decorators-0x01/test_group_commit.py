@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Module for testing the GroupCommitter.
+"""
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from group_commit import GroupCommitter, group_commit
+
+
+def insert_user(conn, user_id):
+    """Insert one user and return its id."""
+    conn.execute("INSERT INTO users (id, name) VALUES (?, ?)",
+                 (user_id, "user{}".format(user_id)))
+    return user_id
+
+
+class TestGroupCommitter(unittest.TestCase):
+    """Tests the GroupCommitter class.
+    """
+    def setUp(self) -> None:
+        """Create a users table in a temporary database."""
+        self.tmpdir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmpdir, "users.db")
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        conn.commit()
+        conn.close()
+
+    def tearDown(self) -> None:
+        """Remove the temporary database."""
+        shutil.rmtree(self.tmpdir)
+
+    def user_ids(self) -> list:
+        """Ids committed to the database."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return [row[0] for row in conn.execute("SELECT id FROM users ORDER BY id")]
+        finally:
+            conn.close()
+
+    def test_writes_share_a_batch(self) -> None:
+        """Tests that concurrent writes commit together and each gets its result.
+        """
+        with GroupCommitter(self.db_path, max_delay=0.05) as committer:
+            futures = [committer.submit(insert_user, n) for n in range(1, 21)]
+            results = [future.result(timeout=5) for future in futures]
+            stats = committer.stats()
+
+        self.assertEqual(results, list(range(1, 21)))
+        self.assertEqual(self.user_ids(), list(range(1, 21)))
+        self.assertEqual(stats["writes"], 20)
+        self.assertLess(stats["batches"], 20)
+
+    def test_decorator_from_threads(self) -> None:
+        """Tests group_commit with callers on several threads.
+        """
+        with GroupCommitter(self.db_path, max_delay=0.02) as committer:
+            add = group_commit(insert_user, committer=committer)
+            threads = [threading.Thread(target=add, args=(n,)) for n in range(1, 9)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(self.user_ids(), list(range(1, 9)))
+
+    def test_failed_write_is_isolated(self) -> None:
+        """Tests that a failing write fails alone and the rest of its batch commits.
+        """
+        with GroupCommitter(self.db_path, max_delay=0.05) as committer:
+            good = committer.submit(insert_user, 1)
+            duplicate = committer.submit(insert_user, 1)
+            other = committer.submit(insert_user, 2)
+
+            self.assertEqual(good.result(timeout=5), 1)
+            self.assertRaises(sqlite3.IntegrityError, duplicate.result, 5)
+            self.assertEqual(other.result(timeout=5), 2)
+            stats = committer.stats()
+
+        self.assertEqual(self.user_ids(), [1, 2])
+        self.assertEqual(stats["failed"], 1)
+        self.assertEqual(stats["commits_failed"], 0)
+
+    def test_write_that_commits_fails_alone(self) -> None:
+        """Tests that commit() inside a write fails only that write.
+        """
+        def insert_and_commit(conn, user_id):
+            """A write that commits itself, as transactional does."""
+            insert_user(conn, user_id)
+            conn.commit()
+
+        with GroupCommitter(self.db_path, max_delay=0.05) as committer:
+            futures = [committer.submit(insert_user, n) for n in range(1, 6)]
+            rogue = committer.submit(insert_and_commit, 6)
+
+            for n, future in enumerate(futures, 1):
+                self.assertEqual(future.result(timeout=5), n)
+            self.assertRaises(sqlite3.ProgrammingError, rogue.result, 5)
+            stats = committer.stats()
+
+        self.assertEqual(self.user_ids(), [1, 2, 3, 4, 5])
+        self.assertEqual(stats["commits_failed"], 0)
+
+    def test_conflict_rollback_resolves_every_future(self) -> None:
+        """Tests that a write ending the transaction itself strands no caller.
+        """
+        def insert_or_rollback(conn):
+            """Conflicts with id 1 and rolls back the whole transaction."""
+            conn.execute("INSERT OR ROLLBACK INTO users (id, name) VALUES (1, 'x')")
+
+        with GroupCommitter(self.db_path, max_delay=0.05) as committer:
+            futures = [committer.submit(insert_user, 1),
+                       committer.submit(insert_or_rollback),
+                       committer.submit(insert_user, 2)]
+            for future in futures:
+                self.assertRaises(sqlite3.Error, future.result, 5)
+
+    def test_close_drains_queue(self) -> None:
+        """Tests that close commits queued writes and refuses new ones.
+        """
+        committer = GroupCommitter(self.db_path, max_delay=0.05)
+        futures = [committer.submit(insert_user, n) for n in range(1, 4)]
+        committer.close()
+
+        self.assertTrue(all(future.done() for future in futures))
+        self.assertEqual(self.user_ids(), [1, 2, 3])
+        self.assertRaises(RuntimeError, committer.submit, insert_user, 4)
+
+    def test_writer_failure_fails_queued_writes(self) -> None:
+        """Tests that writes queued to a dead writer fail instead of hanging.
+        """
+        committer = GroupCommitter(os.path.join(self.tmpdir, "missing", "x.db"))
+        committer._writer.join(timeout=5)
+
+        self.assertFalse(committer._writer.is_alive())
+        self.assertRaises(RuntimeError, committer.submit, insert_user, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
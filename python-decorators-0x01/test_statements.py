@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Module for testing the batchable decorator.
+"""
+import sqlite3
+import unittest
+
+from statements import batchable
+
+
+class TestBatchable(unittest.TestCase):
+    """Tests the batchable decorator.
+    """
+    def setUp(self) -> None:
+        """Create an in-memory users table and trace its statements."""
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute(
+            "CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, email TEXT)")
+        self.conn.executemany("INSERT INTO users VALUES (?, ?, ?)",
+                              [(1, "a", "a@x"), (2, "b", "b@x")])
+        self.conn.commit()
+        self.statements = []
+        self.conn.set_trace_callback(self.statements.append)
+
+    def tearDown(self) -> None:
+        """Close the connection."""
+        self.conn.close()
+
+    def emails(self) -> list:
+        """Current emails by id."""
+        return self.conn.execute("SELECT email FROM users ORDER BY id").fetchall()
+
+    def test_positional_writes(self) -> None:
+        """Tests that a write-only batch runs and returns each result.
+        """
+        @batchable
+        def update_email(conn, user_id, email):
+            conn.execute("UPDATE users SET email = ? WHERE id = ?", (email, user_id))
+            return user_id
+
+        self.assertEqual(update_email(self.conn, batch=[(1, "x"), (2, "y")]), [1, 2])
+        self.assertEqual(self.emails(), [("x",), ("y",)])
+
+    def test_named_parameters(self) -> None:
+        """Tests that named parameters are bound by value, not by name.
+        """
+        @batchable
+        def update_email(conn, user_id, email):
+            conn.execute("UPDATE users SET email = :email WHERE id = :id",
+                         {"email": email, "id": user_id})
+
+        update_email(self.conn, batch=[(1, "x"), (2, "y")])
+        self.assertEqual(self.emails(), [("x",), ("y",)])
+
+    def test_rowcount_runs_per_entry(self) -> None:
+        """Tests that reading rowcount falls back to running each entry.
+        """
+        @batchable
+        def update_email(conn, user_id, email):
+            cursor = conn.cursor()
+            cursor.execute("UPDATE users SET email = ? WHERE id = ?", (email, user_id))
+            return cursor.rowcount
+
+        self.assertEqual(update_email(self.conn, batch=[(1, "x"), (3, "z")]), [1, 0])
+        self.assertEqual(self.emails(), [("x",), ("b@x",)])
+
+    def test_lastrowid_runs_per_entry(self) -> None:
+        """Tests that reading lastrowid falls back to running each entry.
+        """
+        @batchable
+        def add_user(conn, name):
+            cursor = conn.cursor()
+            cursor.execute("INSERT INTO users (name, email) VALUES (?, ?)",
+                           (name, name + "@x"))
+            return cursor.lastrowid
+
+        self.assertEqual(add_user(self.conn, batch=["c", "d"]), [3, 4])
+
+    def test_commit_runs_per_entry(self) -> None:
+        """Tests that a function that commits still works in a batch.
+        """
+        @batchable
+        def update_email(conn, user_id, email):
+            conn.execute("UPDATE users SET email = ? WHERE id = ?", (email, user_id))
+            conn.commit()
+
+        update_email(self.conn, batch=[(1, "x"), (2, "y")])
+        self.assertEqual(self.emails(), [("x",), ("y",)])
+        self.assertFalse(self.conn.in_transaction)
+
+    def test_batch_fetch(self) -> None:
+        """Tests that batch_fetch answers a read batch in one call.
+        """
+        def fetch(conn, items):
+            """Answer the batch with one IN query."""
+            ids = [user_id for user_id, in items]
+            rows = dict(conn.execute(
+                "SELECT id, name FROM users WHERE id IN ({})".format(
+                    ", ".join("?" * len(ids))), ids).fetchall())
+            return [rows.get(user_id) for user_id in ids]
+
+        @batchable(batch_fetch=fetch)
+        def get_name(conn, user_id):
+            return conn.execute("SELECT name FROM users WHERE id = ?",
+                                (user_id,)).fetchone()[0]
+
+        self.assertEqual(get_name(self.conn, 2), "b")
+        self.statements.clear()
+        self.assertEqual(get_name(self.conn, batch=[1, 2, 9]), ["a", "b", None])
+        self.assertEqual(len(self.statements), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Batched user lookups: get_users_by_ids fetches many users with one
+WHERE id IN (...) query, and UserLoader coalesces individual lookups made
+within a short window into such a query.
+"""
+import threading
+from concurrent.futures import Future
+
+import db_connections
+
+# SQLite's default limit on bound parameters per statement
+MAX_VARIABLES = 999
+
+
+def fetch_users_by_ids(conn, user_ids):
+    """
+    Returns {id: row} for the given ids, querying in chunks that stay under
+    SQLite's bound-parameter limit. Missing ids are left out.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    users = {}
+    cursor = conn.cursor()
+    for start in range(0, len(user_ids), MAX_VARIABLES):
+        chunk = user_ids[start:start + MAX_VARIABLES]
+        placeholders = ", ".join("?" * len(chunk))
+        cursor.execute(f"SELECT * FROM users WHERE id IN ({placeholders})", chunk)
+        for row in cursor.fetchall():
+            users[row[0]] = row
+    cursor.close()
+    return users
+
+
+def get_users_by_ids(user_ids):
+    conn = db_connections.connect()
+    try:
+        return fetch_users_by_ids(conn, user_ids)
+    finally:
+        db_connections.release(conn)
+
+
+class UserLoader:
+    """
+    Coalesces get_user_by_id calls: lookups requested within window seconds
+    of each other (or until max_batch keys are waiting) are sent as one IN
+    query. Keys are deduplicated and results are cached for the lifetime
+    of the loader, so create one loader per request scope.
+
+    load() blocks for the result; load_future() returns a Future, which
+    asyncio code can await with asyncio.wrap_future.
+    """
+
+    def __init__(self, window=0.002, max_batch=500, fetch=get_users_by_ids):
+        self.window = window
+        self.max_batch = max_batch
+        self._fetch = fetch
+        self._cache = {}
+        self._pending = {}
+        self._timer = None
+        self._lock = threading.Lock()
+        self.batches = 0
+
+    def load_future(self, user_id):
+        with self._lock:
+            future = self._cache.get(user_id)
+            if future is not None:
+                return future
+            future = self._cache[user_id] = Future()
+            self._pending[user_id] = future
+            dispatch_now = len(self._pending) >= self.max_batch
+            if not dispatch_now and self._timer is None:
+                self._timer = threading.Timer(self.window, self.dispatch)
+                self._timer.daemon = True
+                self._timer.start()
+        if dispatch_now:
+            self.dispatch()
+        return future
+
+    def load(self, user_id):
+        return self.load_future(user_id).result()
+
+    def load_many(self, user_ids):
+        futures = [self.load_future(user_id) for user_id in user_ids]
+        return [future.result() for future in futures]
+
+    def dispatch(self):
+        """
+        Sends every pending key now instead of waiting for the window.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if pending:
+                self.batches += 1
+        if not pending:
+            return
+        try:
+            users = self._fetch(list(pending))
+        except Exception as e:
+            with self._lock:
+                # Let a later load retry the keys that failed
+                for user_id in pending:
+                    self._cache.pop(user_id, None)
+            for future in pending.values():
+                future.set_exception(e)
+            return
+        for user_id, future in pending.items():
+            future.set_result(users.get(user_id))
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
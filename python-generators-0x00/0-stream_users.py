@@ -1,17 +1,18 @@
-import mysql.connector
+pool = __import__('pool')
+streaming = __import__('streaming')
 
-def stream_users():
-    connection = mysql.connector.connect(
-        host="localhost",
-        user="your_mysql_user",
-        password="your_mysql_password",
-        database="ALX_prodev"
-    )
-    cursor = connection.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM user_data")
+def stream_users(fetch_size=None, stats=None):
+    with pool.get_pool().connection() as connection:
+        if fetch_size:
+            for chunk in streaming.stream_rows(connection, "SELECT * FROM user_data",
+                                               fetch_size=fetch_size, stats=stats):
+                yield from chunk
+            return
 
-    for row in cursor:
-        yield row
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("SELECT * FROM user_data")
 
-    cursor.close()
-    connection.close()
+        for row in cursor:
+            yield row
+
+        cursor.close()
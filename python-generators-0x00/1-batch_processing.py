@@ -1,29 +1,74 @@
-import mysql.connector
-
-def stream_users_in_batches(batch_size):
-    connection = mysql.connector.connect(
-        host="localhost",
-        user="your_mysql_user",
-        password="your_mysql_password",
-        database="ALX_prodev"
-    )
-    cursor = connection.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM user_data")
-
-    batch = []
-    for row in cursor:
-        batch.append(row)
-        if len(batch) == batch_size:
+pool = __import__('pool')
+streaming = __import__('streaming')
+
+def stream_users_in_batches(batch_size, server_side=False, stats=None):
+    with pool.get_pool().connection() as connection:
+        if server_side:
+            yield from streaming.stream_rows(connection, "SELECT * FROM user_data",
+                                             fetch_size=batch_size, stats=stats)
+            return
+
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("SELECT * FROM user_data")
+
+        batch = []
+        for row in cursor:
+            batch.append(row)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
             yield batch
-            batch = []
-    if batch:
-        yield batch
 
-    cursor.close()
-    connection.close()
+        cursor.close()
+
+COMPARISONS = ("=", "!=", "<", "<=", ">", ">=")
+
+def build_where(predicates):
+    """
+    Turns predicates such as ("age", ">", 25), ("age", "between", (20, 30))
+    or ("email", "in", [...]) into a parameterized WHERE clause. Predicates
+    are ANDed together.
+    """
+    clauses = []
+    params = []
+    for column, operator, value in predicates:
+        streaming.check_columns((column,))
+        operator = operator.lower()
+        if operator in COMPARISONS:
+            clauses.append(f"{column} {operator} %s")
+            params.append(value)
+        elif operator == "between":
+            low, high = value
+            clauses.append(f"{column} BETWEEN %s AND %s")
+            params.extend((low, high))
+        elif operator in ("in", "not in"):
+            values = list(value)
+            if not values:
+                clauses.append("1 = 0" if operator == "in" else "1 = 1")
+                continue
+            placeholders = ", ".join(["%s"] * len(values))
+            clauses.append(f"{column} {operator.upper()} ({placeholders})")
+            params.extend(values)
+        else:
+            raise ValueError(f"Unsupported operator: {operator}")
+    where = " WHERE " + " AND ".join(clauses) if clauses else ""
+    return where, params
+
+def stream_filtered_batches(batch_size, predicates=(), columns=None, stats=None):
+    if columns:
+        streaming.check_columns(columns)
+        projection = ", ".join(columns)
+    else:
+        projection = "*"
+    where, params = build_where(predicates)
+    query = f"SELECT {projection} FROM user_data{where}"
+
+    with pool.get_pool().connection() as connection:
+        yield from streaming.stream_rows(connection, query, params,
+                                         fetch_size=batch_size, stats=stats)
 
 def batch_processing(batch_size):
-    for batch in stream_users_in_batches(batch_size):
+    for batch in stream_filtered_batches(batch_size, [("age", ">", 25)]):
         for user in batch:
-            if user["age"] > 25:
-                return user
+            yield user
@@ -1,15 +1,64 @@
-seed = __import__('seed')
+import base64
+import json
+import queue
+import threading
+import time
+
+pool = __import__('pool')
+streaming = __import__('streaming')
+
+_DONE = object()
 
 def paginate_users(page_size, offset):
-    connection = seed.connect_to_prodev()
-    cursor = connection.cursor(dictionary=True)
-    cursor.execute(f"SELECT * FROM user_data LIMIT {page_size} OFFSET {offset}")
-    rows = cursor.fetchall()
-    cursor.close()
-    connection.close()
+    with pool.get_pool().connection() as connection:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute(f"SELECT * FROM user_data LIMIT {page_size} OFFSET {offset}")
+        rows = cursor.fetchall()
+        cursor.close()
+    return rows
+
+def encode_cursor(row, key_columns=("user_id",)):
+    values = [row[column] for column in key_columns]
+    raw = json.dumps(values, default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def decode_cursor(cursor):
+    return json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+
+def paginate_users_after(page_size, after=None, key_columns=("user_id",)):
+    """
+    Fetches the page that follows the key values in after by seeking on the
+    ordered key_columns, so every page costs the same regardless of depth.
+    """
+    streaming.check_columns(key_columns, kind="key column")
+    columns = ", ".join(key_columns)
+    query = "SELECT * FROM user_data"
+    params = []
+    if after is not None:
+        placeholders = ", ".join(["%s"] * len(key_columns))
+        query += f" WHERE ({columns}) > ({placeholders})"
+        params.extend(after)
+    query += f" ORDER BY {columns} LIMIT %s"
+    params.append(page_size)
+
+    with pool.get_pool().connection() as connection:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        cursor.close()
     return rows
 
-def lazy_pagination(page_size):
+def _fetch_pages(page_size, keyset, cursor, key_columns):
+    if keyset or cursor is not None:
+        after = decode_cursor(cursor) if cursor is not None else None
+        while True:
+            page = paginate_users_after(page_size, after, key_columns)
+            if not page:
+                break
+            yield page
+            after = [page[-1][column] for column in key_columns]
+        return
+
     offset = 0
     while True:
         page = paginate_users(page_size, offset)
@@ -17,3 +66,78 @@ def lazy_pagination(page_size):
             break
         yield page
         offset += page_size
+
+def _read_ahead(pages, depth, stats):
+    """
+    Fetches up to depth pages ahead on a background thread while the caller
+    works on the current one.
+    """
+    ready = queue.Queue(depth)
+    stop = threading.Event()
+    stats.update(pages=0, stalls=0, stall_time=0.0, producer_waits=0,
+                 max_depth=0, total_depth=0)
+
+    def produce():
+        try:
+            for page in pages:
+                if ready.full():
+                    stats["producer_waits"] += 1
+                while not stop.is_set():
+                    try:
+                        ready.put(page, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    break
+            outcome = _DONE
+        except BaseException as err:
+            outcome = err
+        finally:
+            pages.close()
+        if not stop.is_set():
+            ready.put(outcome)
+
+    worker = threading.Thread(target=produce, daemon=True)
+    worker.start()
+    try:
+        while True:
+            depth_now = ready.qsize()
+            stats["total_depth"] += depth_now
+            stats["max_depth"] = max(stats["max_depth"], depth_now)
+            if depth_now == 0:
+                stats["stalls"] += 1
+                started = time.perf_counter()
+                page = ready.get()
+                stats["stall_time"] += time.perf_counter() - started
+            else:
+                page = ready.get()
+            if page is _DONE:
+                break
+            if isinstance(page, BaseException):
+                raise page
+            stats["pages"] += 1
+            yield page
+    finally:
+        stop.set()
+        while not ready.empty():
+            ready.get_nowait()
+        worker.join()
+        gets = stats["pages"] + 1
+        stats["avg_depth"] = stats["total_depth"] / gets
+
+def lazy_pagination(page_size, keyset=False, cursor=None, key_columns=("user_id",),
+                    prefetch=0, stats=None):
+    """
+    Yields pages of user_data. With keyset=True pages are fetched by seeking
+    past the last key instead of using OFFSET; cursor is an opaque value from
+    encode_cursor(last_row) to resume after a previously seen row.
+
+    With prefetch=K up to K pages are read ahead on a background thread. If a
+    stats dict is given it records queue depth, consumer stalls (and the time
+    spent in them) and how often the reader waited for a free slot.
+    """
+    pages = _fetch_pages(page_size, keyset, cursor, key_columns)
+    if prefetch:
+        return _read_ahead(pages, prefetch, stats if stats is not None else {})
+    return pages
@@ -1,28 +1,132 @@
-import mysql.connector
+import math
+import time
+from decimal import Decimal
+
+pool = __import__('pool')
+streaming = __import__('streaming')
 
 def stream_user_ages():
-    connection = mysql.connector.connect(
-        host="localhost",
-        user="your_mysql_user",
-        password="your_mysql_password",
-        database="ALX_prodev"
-    )
-    cursor = connection.cursor()
-    cursor.execute("SELECT age FROM user_data")
-
-    for (age,) in cursor:
-        yield age
-
-    cursor.close()
-    connection.close()
-
-def compute_average_age():
-    total = 0
-    count = 0
-
-    for age in stream_user_ages():
-        total += age
-        count += 1
-
-    average = total / count if count else 0
-    print(f"Average age of users: {average:.2f}")
+    with pool.get_pool().connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute("SELECT age FROM user_data")
+
+        for (age,) in cursor:
+            yield age
+
+        cursor.close()
+
+def _percentile_rank(percentile, count):
+    # Nearest-rank percentile, computed in exact decimal arithmetic so the
+    # SQL and client paths pick the same row.
+    return max(1, math.ceil(Decimal(str(percentile)) * count / 100))
+
+def _aggregate_in_sql(column, group_by, percentiles):
+    groups = ", ".join(group_by)
+    select_groups = f"{groups}, " if group_by else ""
+    group_clause = f" GROUP BY {groups}" if group_by else ""
+    partition = f"PARTITION BY {groups} " if group_by else ""
+
+    results = {}
+    with pool.get_pool().connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute(
+            f"SELECT {select_groups}COUNT({column}), SUM({column}) "
+            f"FROM user_data{group_clause}"
+        )
+        for row in cursor.fetchall():
+            key, (count, total) = tuple(row[:-2]), row[-2:]
+            if not count:
+                continue
+            results[key] = {"count": count, "avg": float(total) / count}
+
+        for percentile in percentiles:
+            cursor.execute(f"""
+            SELECT {select_groups}MIN({column}) FROM (
+                SELECT {select_groups}{column},
+                    ROW_NUMBER() OVER ({partition}ORDER BY {column}) AS rn,
+                    COUNT({column}) OVER ({partition}) AS cnt
+                FROM user_data
+                WHERE {column} IS NOT NULL
+            ) ranked
+            WHERE rn = GREATEST(CEIL(%s * cnt / 100), 1){group_clause}
+            """, (Decimal(str(percentile)),))
+            for row in cursor.fetchall():
+                key = tuple(row[:-1])
+                if key in results:
+                    results[key][f"p{percentile}"] = float(row[-1])
+        cursor.close()
+    return results
+
+def _aggregate_in_client(column, group_by, percentiles, fetch_size):
+    import numpy as np
+
+    query = f"SELECT {', '.join(group_by + (column,))} FROM user_data"
+    states = {}
+    with pool.get_pool().connection() as connection:
+        for chunk in streaming.stream_rows(connection, query, fetch_size=fetch_size,
+                                           dictionary=False):
+            if group_by:
+                split = {}
+                for row in chunk:
+                    if row[-1] is not None:
+                        split.setdefault(tuple(row[:-1]), []).append(row[-1])
+            else:
+                split = {(): [row[0] for row in chunk if row[0] is not None]}
+
+            for key, values in split.items():
+                values = np.asarray(values, dtype=np.float64)
+                state = states.setdefault(key, {"count": 0, "sum": 0.0, "chunks": []})
+                state["count"] += values.size
+                state["sum"] += float(values.sum())
+                if percentiles:
+                    state["chunks"].append(values)
+
+    results = {}
+    for key, state in states.items():
+        count = state["count"]
+        if not count:
+            continue
+        result = {"count": count, "avg": state["sum"] / count}
+        if percentiles:
+            values = np.sort(np.concatenate(state["chunks"]))
+            for percentile in percentiles:
+                result[f"p{percentile}"] = float(values[_percentile_rank(percentile, count) - 1])
+        results[key] = result
+    return results
+
+def aggregate_ages(column="age", group_by=(), percentiles=(), push_down=True,
+                   fetch_size=10000):
+    """
+    Returns {group key tuple: {"count", "avg", "p<N>"...}} for column over
+    user_data. With push_down the work runs in MySQL; otherwise rows are
+    streamed in fetch_size chunks and accumulated with NumPy.
+    """
+    group_by = tuple(group_by)
+    streaming.check_columns(group_by + (column,))
+    if push_down:
+        return _aggregate_in_sql(column, group_by, percentiles)
+    return _aggregate_in_client(column, group_by, percentiles, fetch_size)
+
+def benchmark_aggregation(group_by=(), percentiles=(50, 95, 99), repeat=3):
+    timings = {}
+    results = {}
+    for push_down in (True, False):
+        best = math.inf
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results[push_down] = aggregate_ages(group_by=group_by,
+                                                percentiles=percentiles,
+                                                push_down=push_down)
+            best = min(best, time.perf_counter() - started)
+        timings["sql" if push_down else "numpy"] = best
+
+    if results[True] != results[False]:
+        raise RuntimeError("SQL and NumPy aggregations disagree")
+    print(f"SQL push-down: {timings['sql']:.4f}s, "
+          f"NumPy client: {timings['numpy']:.4f}s (best of {repeat})")
+    return timings
+
+def compute_average_age(push_down=True):
+    # Without push-down, ages are streamed in chunks and summed with NumPy
+    stats = aggregate_ages(push_down=push_down).get((), {"avg": 0})
+    print(f"Average age of users: {stats['avg']:.2f}")
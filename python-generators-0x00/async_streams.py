@@ -0,0 +1,86 @@
+import asyncio
+import concurrent.futures
+import threading
+
+stream_users = __import__('0-stream_users').stream_users
+stream_users_in_batches = __import__('1-batch_processing').stream_users_in_batches
+lazy_pagination = __import__('2-lazy_paginate').lazy_pagination
+stream_user_ages = __import__('4-stream_ages').stream_user_ages
+
+_DONE = object()
+
+
+def _produce(generator_factory, args, kwargs, loop, items, stop):
+    generator = None
+    try:
+        generator = generator_factory(*args, **kwargs)
+        for item in generator:
+            put = asyncio.run_coroutine_threadsafe(items.put(item), loop)
+            while True:
+                try:
+                    put.result(timeout=0.1)
+                    break
+                except concurrent.futures.TimeoutError:
+                    if stop.is_set():
+                        put.cancel()
+                        return
+            if stop.is_set():
+                return
+        outcome = _DONE
+    except BaseException as err:
+        outcome = err
+    finally:
+        # The generator must be closed on the thread that drives it; this
+        # runs its cleanup (cursor close, pool release) off the event loop.
+        if generator is not None:
+            generator.close()
+    if not stop.is_set():
+        asyncio.run_coroutine_threadsafe(items.put(outcome), loop)
+
+
+async def aiterate(generator_factory, *args, max_pending=2, **kwargs):
+    """
+    Runs a blocking generator on its own thread and yields its items to
+    async for. At most max_pending items are read ahead, so a slow consumer
+    holds the producer back, and closing or cancelling the consumer stops
+    the producer and closes the generator.
+    """
+    loop = asyncio.get_running_loop()
+    items = asyncio.Queue(max_pending)
+    stop = threading.Event()
+    worker = threading.Thread(
+        target=_produce,
+        args=(generator_factory, args, kwargs, loop, items, stop),
+        daemon=True,
+    )
+    worker.start()
+    try:
+        while True:
+            item = await items.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        # Free a producer blocked on a full queue so it notices stop.
+        while not items.empty():
+            items.get_nowait()
+        await asyncio.to_thread(worker.join)
+
+
+def async_stream_users(*args, **kwargs):
+    return aiterate(stream_users, *args, **kwargs)
+
+
+def async_stream_users_in_batches(batch_size, *args, **kwargs):
+    return aiterate(stream_users_in_batches, batch_size, *args, **kwargs)
+
+
+def async_lazy_pagination(page_size, *args, **kwargs):
+    return aiterate(lazy_pagination, page_size, *args, **kwargs)
+
+
+def async_stream_user_ages(*args, **kwargs):
+    return aiterate(stream_user_ages, *args, **kwargs)
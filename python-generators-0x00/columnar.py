@@ -0,0 +1,81 @@
+pool = __import__('pool')
+streaming = __import__('streaming')
+
+USER_DATA_COLUMNS = ("user_id", "name", "email", "age")
+NUMERIC_COLUMNS = ("age",)
+
+
+def stream_column_batches(batch_size=10000, columns=USER_DATA_COLUMNS):
+    """
+    Streams user_data as {column: numpy array} batches built straight from
+    the cursor's row tuples, without a dict per row. Numeric columns become
+    float64 arrays, the rest object arrays.
+    """
+    import numpy as np
+
+    columns = tuple(columns)
+    streaming.check_columns(columns)
+    query = f"SELECT {', '.join(columns)} FROM user_data"
+    with pool.get_pool().connection() as connection:
+        for batch in streaming.stream_rows(connection, query, fetch_size=batch_size,
+                                           dictionary=False):
+            values = list(zip(*batch))
+            yield {
+                column: np.asarray(values[i], dtype=np.float64
+                                   if column in NUMERIC_COLUMNS else object)
+                for i, column in enumerate(columns)
+            }
+
+
+def _schema(columns):
+    import pyarrow as pa
+
+    return pa.schema([
+        (column, pa.float64() if column in NUMERIC_COLUMNS else pa.string())
+        for column in columns
+    ])
+
+
+def stream_record_batches(batch_size=10000, columns=USER_DATA_COLUMNS):
+    import pyarrow as pa
+
+    columns = tuple(columns)
+    schema = _schema(columns)
+    for arrays in stream_column_batches(batch_size, columns):
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(arrays[column], type=schema.field(column).type)
+             for column in columns],
+            schema=schema,
+        )
+
+
+def export_user_data(path, file_format="parquet", batch_size=100000,
+                     columns=USER_DATA_COLUMNS):
+    """
+    Writes user_data to a Parquet or Feather file one record batch at a
+    time, so the table is never materialized in memory. Returns the number
+    of rows written.
+    """
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+
+    columns = tuple(columns)
+    schema = _schema(columns)
+    if file_format == "parquet":
+        writer = pq.ParquetWriter(path, schema)
+        write = writer.write_batch
+    elif file_format == "feather":
+        # Feather V2 is the Arrow IPC file format.
+        writer = ipc.new_file(path, schema)
+        write = writer.write_batch
+    else:
+        raise ValueError(f"Unsupported format: {file_format}")
+
+    rows = 0
+    try:
+        for batch in stream_record_batches(batch_size, columns):
+            write(batch)
+            rows += batch.num_rows
+    finally:
+        writer.close()
+    return rows
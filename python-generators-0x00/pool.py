@@ -0,0 +1,155 @@
+import threading
+import time
+from contextlib import contextmanager
+
+seed = __import__('seed')
+
+
+class ConnectionPool:
+    """
+    A fixed-size pool of ALX_prodev connections.
+
+    Idle connections older than idle_timeout are closed, and a connection that
+    sat idle for longer than health_check_interval is pinged before it is
+    handed out again.
+    """
+
+    def __init__(self, size=5, idle_timeout=300, health_check_interval=30,
+                 connect=None):
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self._connect = connect or seed.connect_to_prodev
+        self._idle = []
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            "checkouts": 0,
+            "created": 0,
+            "reused": 0,
+            "evicted": 0,
+            "wait_time": 0.0,
+            "max_wait": 0.0,
+        }
+
+    def _evict_idle(self, now):
+        expired = [item for item in self._idle
+                   if now - item[1] > self.idle_timeout]
+        if expired:
+            self._idle = [item for item in self._idle
+                          if now - item[1] <= self.idle_timeout]
+            self._stats["evicted"] += len(expired)
+        return [connection for connection, _ in expired]
+
+    def acquire(self, timeout=None):
+        started = time.monotonic()
+        with self._cond:
+            while not self._idle and self._in_use >= self.size:
+                remaining = None
+                if timeout is not None:
+                    remaining = timeout - (time.monotonic() - started)
+                    if remaining <= 0:
+                        raise TimeoutError("Timed out waiting for a pooled connection")
+                self._cond.wait(remaining)
+            now = time.monotonic()
+            expired = self._evict_idle(now)
+            item = self._idle.pop() if self._idle else None
+            self._in_use += 1
+            waited = now - started
+            self._stats["checkouts"] += 1
+            self._stats["wait_time"] += waited
+            self._stats["max_wait"] = max(self._stats["max_wait"], waited)
+
+        for connection in expired:
+            self._close(connection)
+
+        try:
+            if item is not None:
+                connection, released_at = item
+                if (now - released_at <= self.health_check_interval
+                        or connection.is_connected()):
+                    with self._cond:
+                        self._stats["reused"] += 1
+                    return connection
+                self._close(connection)
+                with self._cond:
+                    self._stats["evicted"] += 1
+            connection = self._connect()
+            if connection is None:
+                raise ConnectionError("Could not connect to ALX_prodev")
+            with self._cond:
+                self._stats["created"] += 1
+            return connection
+        except BaseException:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, connection, discard=False):
+        # A generator abandoned mid-result leaves unread rows on the wire;
+        # draining them could take as long as the scan itself.
+        if getattr(connection, "unread_result", False):
+            discard = True
+        if discard:
+            self._close(connection)
+        with self._cond:
+            self._in_use -= 1
+            if not discard:
+                self._idle.append((connection, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        connection = self.acquire(timeout)
+        try:
+            yield connection
+        except BaseException:
+            self.release(connection, discard=not connection.is_connected())
+            raise
+        else:
+            self.release(connection)
+
+    def metrics(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats["in_use"] = self._in_use
+            stats["idle"] = len(self._idle)
+            stats["size"] = self.size
+        checkouts = stats["checkouts"]
+        stats["avg_wait"] = stats["wait_time"] / checkouts if checkouts else 0.0
+        return stats
+
+    def close(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._close(connection)
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def configure(**kwargs):
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = ConnectionPool(**kwargs)
+    return _pool
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool()
+        return _pool
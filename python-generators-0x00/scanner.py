@@ -0,0 +1,129 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+pool = __import__('pool')
+streaming = __import__('streaming')
+
+_DONE = object()
+
+
+def uuid_boundaries(partitions):
+    """
+    Splits the user_id space into evenly sized ranges. user_id holds random
+    UUIDs, so ranges over the leading hex digits hold similar row counts.
+    """
+    space = 16 ** 8
+    return [format(i * space // partitions, "08x") for i in range(1, partitions)]
+
+
+def key_ranges(boundaries):
+    lows = [None] + list(boundaries)
+    highs = list(boundaries) + [None]
+    return list(zip(lows, highs))
+
+
+def _range_query(low, high, projection, ordered):
+    clauses = []
+    params = []
+    if low is not None:
+        clauses.append("user_id >= %s")
+        params.append(low)
+    if high is not None:
+        clauses.append("user_id < %s")
+        params.append(high)
+    query = f"SELECT {projection} FROM user_data"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    if ordered:
+        query += " ORDER BY user_id"
+    return query, params
+
+
+def _put(target, item, stop):
+    while not stop.is_set():
+        try:
+            target.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _scan_partition(index, key_range, target, stop, batch_size, projection,
+                    ordered, progress):
+    if stop.is_set():
+        return
+    try:
+        query, params = _range_query(*key_range, projection, ordered)
+        rows = 0
+        with pool.get_pool().connection() as connection:
+            for batch in streaming.stream_rows(connection, query, params,
+                                               fetch_size=batch_size):
+                if not _put(target, (index, batch), stop):
+                    return
+                rows += len(batch)
+                if progress:
+                    progress(index, rows, False)
+        if progress:
+            progress(index, rows, True)
+        _put(target, (index, _DONE), stop)
+    except BaseException as err:
+        _put(target, (index, err), stop)
+
+
+def scan_partitioned(batch_size=1000, parallelism=4, partitions=None,
+                     boundaries=None, ordered=False, columns=None,
+                     progress=None, max_pending=4):
+    """
+    Scans user_data as ranges of user_id read concurrently on a thread pool,
+    each range on its own pooled connection, and yields the batches as they
+    arrive. With ordered=True batches come out in user_id order.
+
+    progress, if given, is called as progress(partition, rows, done). The
+    shared pool should allow at least parallelism connections.
+    """
+    if boundaries is None:
+        boundaries = uuid_boundaries(partitions or parallelism)
+    ranges = key_ranges(boundaries)
+    if columns:
+        streaming.check_columns(columns)
+        projection = ", ".join(columns)
+    else:
+        projection = "*"
+
+    stop = threading.Event()
+    if ordered:
+        targets = [queue.Queue(max_pending) for _ in ranges]
+    else:
+        shared = queue.Queue(max_pending * parallelism)
+        targets = [shared] * len(ranges)
+
+    executor = ThreadPoolExecutor(max_workers=parallelism)
+    try:
+        for index, key_range in enumerate(ranges):
+            executor.submit(_scan_partition, index, key_range, targets[index],
+                            stop, batch_size, projection, ordered, progress)
+
+        if ordered:
+            for target in targets:
+                while True:
+                    _, item = target.get()
+                    if item is _DONE:
+                        break
+                    if isinstance(item, BaseException):
+                        raise item
+                    yield item
+        else:
+            remaining = len(ranges)
+            while remaining:
+                _, item = shared.get()
+                if item is _DONE:
+                    remaining -= 1
+                    continue
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+    finally:
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -1,7 +1,18 @@
 import mysql.connector
 import csv
+import time
 import uuid
 
+INSERT_USER_SQL = """
+INSERT INTO user_data (user_id, name, email, age)
+VALUES (%s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE name=VALUES(name), email=VALUES(email), age=VALUES(age)
+"""
+
+# user_id is derived from the CSV row number, so replaying a chunk after a
+# failure updates the rows it already inserted instead of duplicating them
+USER_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_DNS, "user_data.ALX_prodev")
+
 def connect_db():
     try:
         connection = mysql.connector.connect(
@@ -19,13 +30,14 @@ def create_database(connection):
     cursor.execute("CREATE DATABASE IF NOT EXISTS ALX_prodev")
     cursor.close()
 
-def connect_to_prodev():
+def connect_to_prodev(allow_local_infile=False):
     try:
         connection = mysql.connector.connect(
             host="localhost",
             user="your_mysql_user",
             password="your_mysql_password",
-            database="ALX_prodev"
+            database="ALX_prodev",
+            allow_local_infile=allow_local_infile
         )
         return connection
     except mysql.connector.Error as err:
@@ -56,10 +68,81 @@ def insert_data(connection, filename):
             name = row['name']
             email = row['email']
             age = row['age']
-            cursor.execute("""
-            INSERT INTO user_data (user_id, name, email, age)
-            VALUES (%s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE name=VALUES(name), email=VALUES(email), age=VALUES(age)
-            """, (user_id, name, email, age))
+            cursor.execute(INSERT_USER_SQL, (user_id, name, email, age))
+    connection.commit()
+    cursor.close()
+
+def read_csv_in_chunks(filename, chunk_size):
+    with open(filename, mode='r', encoding='utf-8') as file:
+        reader = csv.DictReader(file)
+        chunk = []
+        for row_number, row in enumerate(reader):
+            user_id = str(uuid.uuid5(USER_ID_NAMESPACE, str(row_number)))
+            chunk.append((user_id, row['name'], row['email'], row['age']))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+def insert_data_in_chunks(connection, filename, chunk_size=1000, start_chunk=0):
+    """
+    Streams the CSV in chunks of chunk_size rows and inserts each chunk with a
+    single executemany (rewritten into one multi-row INSERT by the connector),
+    committing once per chunk.
+
+    Returns None when every chunk was loaded, or the index of the chunk that
+    failed; pass that index back as start_chunk to resume the load. Row ids
+    are deterministic, so replaying chunks that were already committed (e.g.
+    after a crash) upserts them rather than duplicating them.
+    """
+    cursor = connection.cursor()
+    inserted = 0
+    started = time.perf_counter()
+    failed_chunk = None
+    for index, chunk in enumerate(read_csv_in_chunks(filename, chunk_size)):
+        if index < start_chunk:
+            continue
+        try:
+            cursor.executemany(INSERT_USER_SQL, chunk)
+            connection.commit()
+        except mysql.connector.Error as err:
+            connection.rollback()
+            print(f"Error in chunk {index}: {err}")
+            failed_chunk = index
+            break
+        inserted += len(chunk)
+    cursor.close()
+    elapsed = time.perf_counter() - started
+    rate = inserted / elapsed if elapsed else 0
+    print(f"Inserted {inserted} rows in {elapsed:.2f}s ({rate:.0f} rows/sec)")
+    return failed_chunk
+
+def load_data_infile(connection, filename):
+    """
+    Bulk loads the CSV through LOAD DATA LOCAL INFILE. The connection must be
+    opened with connect_to_prodev(allow_local_infile=True).
+    """
+    with open(filename, mode='r', encoding='utf-8') as file:
+        header = [name.strip() for name in next(csv.reader(file))]
+    columns = ", ".join(
+        f"@{name}" if name in ('name', 'email', 'age') else "@dummy"
+        for name in header
+    )
+    cursor = connection.cursor()
+    started = time.perf_counter()
+    cursor.execute(f"""
+    LOAD DATA LOCAL INFILE %s INTO TABLE user_data
+    FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+    LINES TERMINATED BY '\\n'
+    IGNORE 1 LINES
+    ({columns})
+    SET user_id = UUID(), name = @name, email = @email, age = @age
+    """, (filename,))
+    inserted = cursor.rowcount
     connection.commit()
     cursor.close()
+    elapsed = time.perf_counter() - started
+    rate = inserted / elapsed if elapsed else 0
+    print(f"Loaded {inserted} rows in {elapsed:.2f}s ({rate:.0f} rows/sec)")
+    return inserted
@@ -0,0 +1,47 @@
+import resource
+import time
+
+
+def check_columns(columns, kind="column"):
+    """
+    Raises ValueError unless every name is a plain identifier, since column
+    names are interpolated into the SQL rather than bound as parameters.
+    """
+    for column in columns:
+        if not column.isidentifier():
+            raise ValueError(f"Invalid {kind}: {column}")
+
+
+def stream_rows(connection, query, params=None, fetch_size=1000,
+                dictionary=True, stats=None):
+    """
+    Yields the result of query in lists of up to fetch_size rows read from an
+    unbuffered (server-side) cursor, so only one chunk is held in client
+    memory at a time.
+
+    If a stats dict is given it is filled with the first-row latency, the
+    number of rows and chunks read and the process peak RSS in kilobytes.
+    """
+    started = time.perf_counter()
+    cursor = connection.cursor(dictionary=dictionary, buffered=False)
+    try:
+        cursor.execute(query, params)
+        rows = 0
+        chunks = 0
+        while True:
+            chunk = cursor.fetchmany(fetch_size)
+            if not chunk:
+                break
+            if stats is not None and chunks == 0:
+                stats["first_row_latency"] = time.perf_counter() - started
+            rows += len(chunk)
+            chunks += 1
+            yield chunk
+        if stats is not None:
+            stats["rows"] = rows
+            stats["chunks"] = chunks
+            stats["elapsed"] = time.perf_counter() - started
+            stats["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    finally:
+        if not connection.unread_result:
+            cursor.close()